@@ -0,0 +1,550 @@
+"""
+Local stand-in for the Google Calendar v3 API and the OAuth token endpoint, for offline
+benchmarks. Serves the calls the calendar tools make (calendar list, incremental event sync,
+event get/insert/update/patch, freeBusy, batch requests, events/calendarList watch channels)
+from generated in-memory calendars, with configurable latency and error rates.
+
+    python benchmarks/fake_google.py [--port 8090] [--latency-ms 50] [--error-rate 0.01]
+
+Point the server at it with GOOGLE_API_ROOT_URL=http://127.0.0.1:8090/ and tokens whose
+token_uri is http://127.0.0.1:8090/token. GET /stats reports request counts per route.
+
+Watch channels get push notifications posted to their address like Google's: a 'sync' message
+when opened, then 'exists' whenever a watched calendar's events change. POST
+/fake/touch/<calendar_id> edits one of the calendar's events as another client would.
+"""
+
+import re
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+import email.parser
+import urllib.error
+import urllib.request
+from collections import Counter
+from email.utils import formatdate
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+EVENTS_PATH = re.compile(r'^/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$')
+Response = Tuple[int, Optional[Dict[str, Any]], Dict[str, str]]
+
+
+def calendar_ids(count: int) -> List[str]:
+    """
+    Ids of the generated calendars: 'primary', then cal-1, cal-2, ...
+    """
+    return ['primary'] + [f'cal-{i}' for i in range(1, count)]
+
+
+def event_id(calendar_index: int, index: int) -> str:
+    """
+    Id of the index-th generated event of a calendar, so clients can address events without
+    listing them first.
+    """
+    return f'bench{calendar_index}x{index}'
+
+
+def _rfc3339(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _parse_time(value: Dict[str, str]) -> float:
+    if 'dateTime' in value:
+        return datetime.fromisoformat(value['dateTime']).timestamp()
+    return datetime.fromisoformat(value['date']).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _error(status: int, reason: str, message: str) -> Response:
+    body = {'error': {'code': status, 'message': message, 'errors': [{'reason': reason}]}}
+    return status, body, {}
+
+
+class FakeCalendar:
+    """
+    One calendar's events, with a sequence number per change for syncToken sync.
+    """
+    def __init__(self, calendar_id: str):
+        self.calendar_id = calendar_id
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.seq = 0
+
+    def put(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        self.seq += 1
+        event['_seq'] = self.seq
+        event['etag'] = f'"{self.seq}"'
+        event['updated'] = _rfc3339(time.time())
+        event['_start'] = _parse_time(event['start'])
+        event['_end'] = _parse_time(event['end'])
+        self.events[event['id']] = event
+        return event
+
+
+class FakeGoogle:
+    """
+    In-memory Calendar API state plus the request router shared by plain and batch requests.
+    """
+    def __init__(
+        self,
+        calendars: int,
+        events: int,
+        token_ttl: int,
+        error_rate: float,
+        throttle_rate: float,
+        seed: int = 0
+    ):
+        self.token_ttl = token_ttl
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.tokens_issued = 0
+        self.calendars: Dict[str, FakeCalendar] = {}
+        # watch channels by id, and the notifications waiting to be posted to them
+        self.channels: Dict[str, Dict[str, Any]] = {}
+        self.notifications: Counter = Counter()
+        self._outbox: queue.Queue = queue.Queue()
+        self._notifier: Optional[threading.Thread] = None
+
+        # events start on the hour within the next 30 days and last 30 to 120 minutes
+        now = time.time() // 3600 * 3600
+        for calendar_index, calendar_id in enumerate(calendar_ids(calendars)):
+            calendar = self.calendars[calendar_id] = FakeCalendar(calendar_id)
+            for index in range(events):
+                start = now + self.random.randrange(30 * 24) * 3600
+                end = start + self.random.choice((30, 60, 90, 120)) * 60
+                calendar.put({
+                    'id': event_id(calendar_index, index),
+                    'status': 'confirmed',
+                    'summary': f'Event {index}',
+                    'description': 'Generated for benchmarks',
+                    'start': {'dateTime': _rfc3339(start)},
+                    'end': {'dateTime': _rfc3339(end)}
+                })
+
+    @staticmethod
+    def _public(event: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in event.items() if not key.startswith('_')}
+
+    def _fault(self) -> Optional[Response]:
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return _error(429, 'rateLimitExceeded', 'Rate Limit Exceeded')
+        if roll < self.throttle_rate + self.error_rate:
+            return _error(503, 'backendError', 'Backend Error')
+        return None
+
+    def handle(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: Optional[Dict[str, Any]]
+    ) -> Response:
+        url = urlsplit(target)
+        path = unquote(url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        with self.lock:
+            if path == '/token' and method == 'POST':
+                self.requests['token'] += 1
+                self.tokens_issued += 1
+                return 200, {
+                    'access_token': f'fake-{self.tokens_issued}',
+                    'expires_in': self.token_ttl,
+                    'token_type': 'Bearer',
+                    'scope': 'https://www.googleapis.com/auth/calendar'
+                }, {}
+
+            fault = self._fault()
+            if fault is not None:
+                self.requests['fault'] += 1
+                return fault
+
+            if path == '/calendar/v3/users/me/calendarList' and method == 'GET':
+                self.requests['calendarList.list'] += 1
+                return self._calendar_list(headers)
+            if path == '/calendar/v3/freeBusy' and method == 'POST':
+                self.requests['freebusy.query'] += 1
+                return self._free_busy(body or {})
+            if path == '/calendar/v3/users/me/calendarList/watch' and method == 'POST':
+                self.requests['calendarList.watch'] += 1
+                return self._watch(None, body or {})
+            if path == '/calendar/v3/channels/stop' and method == 'POST':
+                self.requests['channels.stop'] += 1
+                return self._stop(body or {})
+
+            match = EVENTS_PATH.match(path)
+            if match is None:
+                return _error(404, 'notFound', f'No route for {method} {path}')
+
+            calendar = self.calendars.get(match.group(1))
+            if calendar is None:
+                return _error(404, 'notFound', 'Not Found')
+            if match.group(2) == 'watch' and method == 'POST':
+                self.requests['events.watch'] += 1
+                return self._watch(calendar.calendar_id, body or {})
+            return self._events(calendar, method, match.group(2), query, headers, body)
+
+    def _calendar_list(self, headers: Dict[str, str]) -> Response:
+        etag = f'"calendars-{len(self.calendars)}"'
+        if headers.get('if-none-match') == etag:
+            return 304, None, {'ETag': etag}
+
+        items = [
+            {'id': calendar_id, 'summary': calendar_id, 'description': 'Benchmark calendar'}
+            for calendar_id in self.calendars
+        ]
+        return 200, {'etag': etag, 'items': items}, {'ETag': etag}
+
+    def _free_busy(self, body: Dict[str, Any]) -> Response:
+        time_min = datetime.fromisoformat(body['timeMin']).timestamp()
+        time_max = datetime.fromisoformat(body['timeMax']).timestamp()
+        calendars = {}
+        for item in body.get('items', []):
+            calendar = self.calendars.get(item['id'])
+            if calendar is None:
+                calendars[item['id']] = {'errors': [{'domain': 'global', 'reason': 'notFound'}]}
+                continue
+            busy = sorted(
+                (event['_start'], event['_end'])
+                for event in calendar.events.values()
+                if event['status'] != 'cancelled'
+                and event['_start'] < time_max and event['_end'] > time_min
+            )
+            calendars[item['id']] = {
+                'busy': [{'start': _rfc3339(start), 'end': _rfc3339(end)} for start, end in busy]
+            }
+
+        return 200, {'kind': 'calendar#freeBusy', 'calendars': calendars}, {}
+
+    def _events(
+        self,
+        calendar: FakeCalendar,
+        method: str,
+        event_id: Optional[str],
+        query: Dict[str, str],
+        headers: Dict[str, str],
+        body: Optional[Dict[str, Any]]
+    ) -> Response:
+        if event_id is None and method == 'GET':
+            self.requests['events.list'] += 1
+            return self._list_events(calendar, query)
+        if event_id is None and method == 'POST':
+            self.requests['events.insert'] += 1
+            event_id = (body or {}).get('id') or f'new{calendar.seq + 1}'
+            if event_id in calendar.events:
+                return _error(409, 'duplicate', 'The requested identifier already exists.')
+            event = dict(body or {}, id=event_id, status='confirmed')
+            return 200, self._public(self._put(calendar, event)), {}
+
+        event = calendar.events.get(event_id)
+        if event is None or event['status'] == 'cancelled':
+            return _error(404, 'notFound', 'Not Found')
+
+        if method == 'GET':
+            self.requests['events.get'] += 1
+            return 200, self._public(event), {}
+        if method == 'PUT':
+            self.requests['events.update'] += 1
+            updated = dict(body or {}, id=event_id, status='confirmed')
+            return 200, self._public(self._put(calendar, updated)), {}
+        if method == 'PATCH':
+            self.requests['events.patch'] += 1
+            if_match = headers.get('if-match')
+            if if_match and if_match != event['etag']:
+                return _error(412, 'conditionNotMet', 'Precondition Failed')
+            patched = dict(self._public(event), **(body or {}))
+            return 200, self._public(self._put(calendar, patched)), {}
+
+        return _error(405, 'methodNotAllowed', 'Method Not Allowed')
+
+    def _put(self, calendar: FakeCalendar, event: Dict[str, Any]) -> Dict[str, Any]:
+        event = calendar.put(event)
+        self._notify(calendar.calendar_id, 'exists')
+        return event
+
+    def touch(self, calendar_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Renames one of a calendar's events, as a change made by another client would.
+        """
+        with self.lock:
+            calendar = self.calendars.get(calendar_id)
+            if calendar is None or not calendar.events:
+                return None
+            event = self.random.choice(list(calendar.events.values()))
+            touched = dict(self._public(event), summary=f"{event['summary'].split(' (')[0]} "
+                                                        f"(edited {calendar.seq + 1})")
+            return self._public(self._put(calendar, touched))
+
+    def _watch(self, calendar_id: Optional[str], body: Dict[str, Any]) -> Response:
+        """
+        Opens a channel on a calendar's events, or (calendar_id None) on the calendar list.
+        """
+        if body.get('type') != 'web_hook' or not body.get('id') or not body.get('address'):
+            return _error(400, 'invalid', 'Channel id, web_hook type and address are required')
+        if body['id'] in self.channels:
+            return _error(400, 'channelIdNotUnique', 'Channel id not unique')
+
+        ttl = int(body.get('params', {}).get('ttl', 604800))
+        resource = 'calendarList' if calendar_id is None else f'calendars/{calendar_id}/events'
+        channel = self.channels[body['id']] = {
+            'id': body['id'],
+            'token': body.get('token'),
+            'address': body['address'],
+            'calendar_id': calendar_id,
+            'resource_id': f'resource-{resource.replace("/", "-")}',
+            'resource_uri': f'https://www.googleapis.com/calendar/v3/{resource}',
+            'expiration': int((time.time() + ttl) * 1000),
+            'messages': 0
+        }
+        self._send_notification(channel, 'sync')
+        return 200, {
+            'kind': 'api#channel',
+            'id': channel['id'],
+            'resourceId': channel['resource_id'],
+            'resourceUri': channel['resource_uri'],
+            'token': channel['token'],
+            'expiration': str(channel['expiration'])
+        }, {}
+
+    def _stop(self, body: Dict[str, Any]) -> Response:
+        channel = self.channels.get(body.get('id'))
+        if channel is None or channel['resource_id'] != body.get('resourceId'):
+            return _error(404, 'notFound', 'Channel not found')
+        del self.channels[channel['id']]
+        return 204, None, {}
+
+    def _notify(self, calendar_id: Optional[str], state: str) -> None:
+        now = time.time() * 1000
+        for channel in list(self.channels.values()):
+            if channel['expiration'] <= now:
+                del self.channels[channel['id']]
+            elif channel['calendar_id'] == calendar_id:
+                self._send_notification(channel, state)
+
+    def _send_notification(self, channel: Dict[str, Any], state: str) -> None:
+        channel['messages'] += 1
+        headers = {
+            'X-Goog-Channel-ID': channel['id'],
+            'X-Goog-Channel-Expiration': formatdate(channel['expiration'] / 1000, usegmt=True),
+            'X-Goog-Message-Number': str(channel['messages']),
+            'X-Goog-Resource-ID': channel['resource_id'],
+            'X-Goog-Resource-URI': channel['resource_uri'],
+            'X-Goog-Resource-State': state
+        }
+        if channel['token'] is not None:
+            headers['X-Goog-Channel-Token'] = channel['token']
+        self._outbox.put((channel['address'], headers, state))
+        if self._notifier is None:
+            self._notifier = threading.Thread(
+                target=self._notify_loop,
+                name='fake-google-notifier',
+                daemon=True
+            )
+            self._notifier.start()
+
+    def _notify_loop(self) -> None:
+        """
+        Posts queued notifications one at a time, in order, outside the state lock.
+        """
+        while True:
+            address, headers, state = self._outbox.get()
+            request = urllib.request.Request(address, data=b'', headers=headers, method='POST')
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    outcome = f'{state}:{response.status}'
+            except urllib.error.HTTPError as e:
+                outcome = f'{state}:{e.code}'
+            except OSError:
+                outcome = f'{state}:unreachable'
+            with self.lock:
+                self.notifications[outcome] += 1
+
+    def _list_events(self, calendar: FakeCalendar, query: Dict[str, str]) -> Response:
+        page_size = int(query.get('maxResults', 250))
+        if 'pageToken' in query:
+            since, offset = (int(part) for part in query['pageToken'].split(':'))
+        else:
+            since, offset = int(query.get('syncToken', 0)), 0
+
+        if since > calendar.seq:
+            return _error(410, 'fullSyncRequired', 'Sync token is no longer valid')
+
+        changed = sorted(
+            (event for event in calendar.events.values() if event['_seq'] > since),
+            key=lambda event: event['_seq']
+        )
+        page = changed[offset:offset + page_size]
+        response: Dict[str, Any] = {'items': [self._public(event) for event in page]}
+        if offset + page_size < len(changed):
+            response['nextPageToken'] = f'{since}:{offset + page_size}'
+        else:
+            response['nextSyncToken'] = str(calendar.seq)
+
+        return 200, response, {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'requests': dict(self.requests),
+                'tokens_issued': self.tokens_issued,
+                'channels': len(self.channels),
+                'notifications': dict(self.notifications)
+            }
+
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    google: FakeGoogle
+    latency: float = 0.0
+    jitter: float = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self) -> None:
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Dict[str, str]):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _handle(self) -> None:
+        raw = self._read_body()
+        if self.path == '/stats':
+            payload = json.dumps(self.google.stats()).encode()
+            return self._send(200, payload, 'application/json', {})
+        if self.path == '/healthz':
+            return self._send(200, b'ok', 'text/plain', {})
+        if self.path.startswith('/fake/touch/') and self.command == 'POST':
+            event = self.google.touch(unquote(self.path[len('/fake/touch/'):]))
+            status = 200 if event is not None else 404
+            return self._send(status, json.dumps(event).encode(), 'application/json', {})
+
+        self._delay()
+        if self.path.startswith('/batch/'):
+            return self._batch(raw)
+
+        headers = {name.lower(): value for name, value in self.headers.items()}
+        is_json = 'json' in headers.get('content-type', '')
+        body = json.loads(raw) if raw and is_json else None
+
+        status, payload, extra = self.google.handle(self.command, self.path, headers, body)
+        data = json.dumps(payload).encode() if payload is not None else b''
+        self._send(status, data, 'application/json; charset=UTF-8', extra)
+
+    def _batch(self, raw: bytes) -> None:
+        """
+        Answers a multipart/mixed batch the way googleapiclient's BatchHttpRequest expects: one
+        application/http part per sub-request, with Content-ID <response-...>.
+        """
+        content_type = self.headers['Content-Type']
+        message = email.parser.BytesParser().parsebytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + raw
+        )
+        boundary = 'batch_fake_google'
+        parts = []
+        for part in message.get_payload():
+            content_id = part['Content-ID'].strip('<>')
+            request = part.get_payload()
+            head, _, body_text = request.partition('\r\n\r\n') if '\r\n\r\n' in request \
+                else request.partition('\n\n')
+            request_line, *header_lines = head.splitlines()
+            method, target, _ = request_line.split(' ', 2)
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = json.loads(body_text) if body_text.strip() else None
+
+            status, payload, _ = self.google.handle(method, target, headers, body)
+            payload_text = json.dumps(payload) if payload is not None else ''
+            parts.append(
+                f'--{boundary}\r\n'
+                'Content-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status} {"OK" if status < 400 else "Error"}\r\n'
+                'Content-Type: application/json; charset=UTF-8\r\n'
+                f'Content-Length: {len(payload_text)}\r\n\r\n'
+                f'{payload_text}\r\n'
+            )
+
+        data = (''.join(parts) + f'--{boundary}--\r\n').encode()
+        self._send(200, data, f'multipart/mixed; boundary={boundary}', {})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+def serve(
+    port: int,
+    google: FakeGoogle,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0
+) -> ThreadingHTTPServer:
+    """
+    Starts the fake API on 127.0.0.1:port in a background thread and returns the server.
+    """
+    handler = type('Handler', (FakeGoogleHandler,), {
+        'google': google,
+        'latency': latency_ms / 1000,
+        'jitter': jitter_ms / 1000
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-google', daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    The fake API's settings, shared with the load benchmark's command line.
+    """
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of 429 responses')
+    parser.add_argument('--calendars', type=int, default=3)
+    parser.add_argument('--events', type=int, default=500, help='events per calendar')
+    parser.add_argument('--token-ttl', type=int, default=3600,
+                        help='lifetime of issued tokens, in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8090)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    google = FakeGoogle(
+        args.calendars, args.events, args.token_ttl, args.error_rate, args.throttle_rate, args.seed
+    )
+    server = serve(args.port, google, args.latency_ms, args.jitter_ms)
+    print(f"fake Google API on http://127.0.0.1:{args.port}/", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
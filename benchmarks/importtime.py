@@ -0,0 +1,91 @@
+"""
+Import-time profile of the server's cold start. Runs `python -X importtime -c "import main"` from
+src/ a few times and summarizes the report: total import time and the slowest top-level packages
+and modules.
+
+    python benchmarks/importtime.py [--runs 5] [--top 15] [--module main]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# module-level settings main needs to import; a throwaway database keeps runs side-effect free
+BENCH_ENV = {
+    'SERVER_HOST': '127.0.0.1',
+    'SERVER_PORT': '8000',
+    'DB_PATH': os.path.join(os.environ.get('TMPDIR', '/tmp'), 'importtime-bench.db')
+}
+
+Row = Tuple[int, int, int, str]
+
+
+def _profile(module: str) -> List[Row]:
+    """
+    One cold import of module. Returns (self us, cumulative us, depth, name) per imported module.
+    """
+    env = {**os.environ, **BENCH_ENV, 'PYTHONPATH': SRC_DIR}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--module', default='main')
+    args = parser.parse_args()
+
+    totals: List[int] = []
+    packages: Dict[str, List[int]] = defaultdict(list)
+    modules: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(args.runs):
+        rows = _profile(args.module)
+        totals.append(sum(self_us for self_us, _, _, _ in rows))
+
+        per_package: Dict[str, int] = defaultdict(int)
+        for self_us, cumulative_us, _, name in rows:
+            per_package[name.split('.')[0]] += self_us
+            modules[name].append(cumulative_us)
+        for package, self_us in per_package.items():
+            packages[package].append(self_us)
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms "
+          f"over {args.runs} runs (min {min(totals) / 1000:.1f} ms)")
+
+    print(f"\ntop {args.top} packages by self time (median ms)")
+    ranked = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))
+    for package, samples in ranked[:args.top]:
+        print(f"  {statistics.median(samples) / 1000:8.1f}  {package}")
+
+    print(f"\ntop {args.top} modules by cumulative time (median ms)")
+    ranked = sorted(modules.items(), key=lambda item: -statistics.median(item[1]))
+    for name, samples in ranked[:args.top]:
+        print(f"  {statistics.median(samples) / 1000:8.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
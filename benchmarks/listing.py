@@ -0,0 +1,159 @@
+"""
+Micro-benchmark of the event listing path. Decodes synthetic Events API items (shaped like the
+store's SYNC_FIELDS responses) into gcsa Events and into the store's EventRecords, and reports
+per-event CPU time, allocations and retained memory for decoding alone and for decoding plus
+list_events' field projection. A full CalendarEventStore sync and page read is timed too.
+
+    python benchmarks/listing.py [--events 10000] [--runs 5]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from gcsa.serializers.event_serializer import EventSerializer
+from mcp_tools.google.calendar import _project_events
+from mcp_tools.google.event_store import CalendarEventStore, EventRecord
+
+
+def make_items(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Events API items with the fields the store requests; one in ten is an all-day event.
+    """
+    rng = random.Random(seed)
+    offset = timezone(timedelta(hours=-5))
+    first = datetime(2026, 1, 5, tzinfo=offset)
+    items = []
+    for index in range(count):
+        start = first + timedelta(minutes=15 * rng.randrange(4 * 24 * 90))
+        if index % 10 == 0:
+            start_value = {'date': start.date().isoformat()}
+            end_value = {'date': (start.date() + timedelta(days=1)).isoformat()}
+        else:
+            start_value = {'dateTime': start.isoformat(), 'timeZone': 'America/New_York'}
+            end_value = {'dateTime': (start + timedelta(minutes=30)).isoformat()}
+        items.append({
+            'id': f'event{index:08d}',
+            'status': 'confirmed',
+            'summary': f'Event {index}',
+            'description': 'Generated for benchmarks' if index % 3 else None,
+            'location': 'Room 4' if index % 2 else None,
+            'start': start_value,
+            'end': end_value
+        })
+    return items
+
+
+def gcsa_decode(item: Dict[str, Any]):
+    # to_object pops keys from the item it's given
+    return EventSerializer.to_object(dict(item))
+
+
+DECODERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'gcsa Event': gcsa_decode,
+    'EventRecord': EventRecord.from_json,
+}
+
+
+def _time_per_event(run: Callable[[], Any], count: int, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) / count * 1e6
+
+
+def _memory_per_event(run: Callable[[], Any], count: int) -> Dict[str, float]:
+    """
+    Bytes allocated at peak while running, and bytes still held by its result, per event.
+    """
+    tracemalloc.start()
+    try:
+        result = run()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {'peak': peak / count, 'retained': retained / count}
+
+
+class _Request:
+    def __init__(self, response: Dict[str, Any]):
+        self.response = response
+
+    def execute(self) -> Dict[str, Any]:
+        return self.response
+
+
+class _Events:
+    def __init__(self, items: List[Dict[str, Any]], page_size: int):
+        self.items = items
+        self.page_size = page_size
+
+    def list(self, pageToken=None, **params) -> _Request:
+        start = int(pageToken or 0)
+        end = start + self.page_size
+        response = {'items': self.items[start:end]}
+        if end < len(self.items):
+            response['nextPageToken'] = str(end)
+        else:
+            response['nextSyncToken'] = 'sync'
+        return _Request(response)
+
+
+class _Service:
+    def __init__(self, items: List[Dict[str, Any]], page_size: int = 2500):
+        self._events = _Events(items, page_size)
+
+    def events(self) -> _Events:
+        return self._events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=250, help='events projected per page')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    items = make_items(args.events, args.seed)
+    count = len(items)
+
+    print(f"{count} events, median of {args.runs} runs")
+    print(f"{'decoder':<14}{'decode us':>12}{'+project us':>13}{'peak B':>10}{'retained B':>12}")
+    for name, decode in DECODERS.items():
+        decode_all = lambda: [decode(item) for item in items]
+        decode_project = lambda: list(_project_events(map(decode, items), None))
+        memory = _memory_per_event(decode_all, count)
+        print(f"{name:<14}{_time_per_event(decode_all, count, args.runs):>12.2f}"
+              f"{_time_per_event(decode_project, count, args.runs):>13.2f}"
+              f"{memory['peak']:>10.0f}{memory['retained']:>12.0f}")
+
+    service = _Service(items)
+    time_min = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    time_max = time_min + timedelta(days=365)
+
+    def sync_and_page():
+        store = CalendarEventStore('primary')
+        store.sync(service)
+        page = list(zip(range(args.page_size), store.iter_range(time_min, time_max)))
+        return list(_project_events((event for _, (_, event) in page), None))
+
+    per_event = _time_per_event(sync_and_page, count, args.runs)
+    print(f"\nstore full sync + {args.page_size}-event page: "
+          f"{per_event * count / 1000:.1f} ms ({per_event:.2f} us per event)")
+
+
+if __name__ == '__main__':
+    main()
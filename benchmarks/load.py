@@ -0,0 +1,562 @@
+"""
+Offline load benchmark of the MCP server. Starts the local fake Google API (fake_google.py) and
+the real server pointed at it, then drives N concurrent MCP sessions over streamable HTTP, one
+principal each. Reports throughput, p50/p95/p99 latency and mean result text size per tool,
+server memory, Google requests per call and per-stage timings from /metrics. Runs can be saved
+and compared, so a regression in the auth or tool path shows up as a flagged delta.
+
+    python benchmarks/load.py [--sessions 8] [--duration 20] [--output run.json]
+    python benchmarks/load.py --compare baseline.json [--threshold 0.1]
+    python benchmarks/load.py --push [--touch-rate 1]
+
+--push has the server watch calendars through the fake API's push notifications instead of
+syncing on every read; --touch-rate edits events behind its back, so notifications flow.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+from mcp.shared.exceptions import McpError
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'src')
+sys.path.insert(0, BENCH_DIR)
+
+from fake_google import add_arguments, calendar_ids, event_id
+
+PRINCIPAL_HEADER = 'x-bench-principal'
+DEFAULT_MIX = 'list_events=5,find_free_slots=2,list_calendars=2,create_event=1,update_event=1'
+STAGE_METRIC = re.compile(
+    r'^mcp_tool_stage_duration_seconds_(sum|count)\{tool="([^"]*)",stage="([^"]*)"\} (\S+)$'
+)
+
+# google-auth treats tokens within 225s of expiry as stale, so shorter lifetimes never work
+MIN_TOKEN_TTL = 300
+
+# tool, seconds, ok, bytes of result text (what a model reads)
+Sample = Tuple[str, float, bool, int]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def _get_text(url: str) -> str:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode()
+
+
+def _seed_tokens(db_path: str, principals: List[str], google_url: str, ttl: int) -> None:
+    """
+    Stores a valid token per principal, refreshable against the fake token endpoint, so no
+    session needs the OAuth consent flow.
+    """
+    sys.path.insert(0, SRC_DIR)
+    from db.db import SQLiteTokenStore
+
+    store = SQLiteTokenStore(path=db_path)
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=ttl)
+    for principal in principals:
+        store.put_token(principal, 'google', json.dumps({
+            'token': f'seed-{principal}',
+            'refresh_token': f'refresh-{principal}',
+            'token_uri': f'{google_url}token',
+            'client_id': 'bench-client',
+            'client_secret': 'bench-secret',
+            'scopes': ['https://www.googleapis.com/auth/calendar'],
+            'expiry': expiry.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        }))
+
+
+def _read_memory(pid: int) -> Dict[str, Optional[int]]:
+    """
+    Current and peak resident set size of a process in KiB, where /proc is available.
+    """
+    memory: Dict[str, Optional[int]] = {'rss_kib': None, 'peak_rss_kib': None}
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    memory['rss_kib'] = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    memory['peak_rss_kib'] = int(line.split()[1])
+    except OSError:
+        pass
+
+    return memory
+
+
+def _stage_totals(metrics_text: str) -> Dict[Tuple[str, str], List[float]]:
+    """
+    (tool, stage) -> [sum seconds, count] from the server's /metrics output.
+    """
+    totals: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for line in metrics_text.splitlines():
+        match = STAGE_METRIC.match(line)
+        if match:
+            kind, tool, stage, value = match.groups()
+            totals[(tool, stage)][0 if kind == 'sum' else 1] += float(value)
+
+    return totals
+
+
+def _stage_means(
+    before: Dict[Tuple[str, str], List[float]],
+    after: Dict[Tuple[str, str], List[float]]
+) -> Dict[str, float]:
+    """
+    Mean milliseconds per stage between two /metrics snapshots, over all tools.
+    """
+    by_stage: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for (tool, stage), (total, count) in after.items():
+        base_total, base_count = before.get((tool, stage), (0.0, 0.0))
+        by_stage[stage][0] += total - base_total
+        by_stage[stage][1] += count - base_count
+
+    return {
+        stage: round(total / count * 1000, 3)
+        for stage, (total, count) in sorted(by_stage.items())
+        if count > 0
+    }
+
+
+def parse_mix(mix: str) -> List[Tuple[str, int]]:
+    weights = []
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        weights.append((name.strip(), int(weight or 1)))
+    return weights
+
+
+def argument_factory(
+    calendars: List[str],
+    events: int
+) -> Dict[str, Callable[[random.Random], Dict[str, Any]]]:
+    """
+    Builds random arguments for each benchmarked tool.
+    """
+    def start(rng: random.Random, days: int = 14) -> str:
+        hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        return (hour + timedelta(hours=rng.randrange(days * 24))).isoformat()
+
+    def update_event(rng: random.Random) -> Dict[str, Any]:
+        index = rng.randrange(len(calendars))
+        return {
+            'calendar_id': calendars[index],
+            'event_id': event_id(index, rng.randrange(max(events, 1))),
+            'start': start(rng),
+            'name': 'Benchmark update'
+        }
+
+    return {
+        'list_calendars': lambda rng: {},
+        'list_events': lambda rng: {
+            'calendar_id': rng.choice(calendars),
+            'start_time': datetime.now().replace(microsecond=0).isoformat(),
+            'duration_days': 7
+        },
+        'list_events_multi': lambda rng: {
+            'calendar_ids': calendars,
+            'start_time': datetime.now().replace(microsecond=0).isoformat(),
+            'duration_days': 7
+        },
+        'find_free_slots': lambda rng: {
+            'start_time': datetime.now().replace(microsecond=0).isoformat(),
+            'calendar_ids': calendars,
+            'duration_days': 7
+        },
+        'create_event': lambda rng: {
+            'calendar_id': rng.choice(calendars),
+            'start': start(rng),
+            'name': 'Benchmark event'
+        },
+        'update_event': update_event,
+        'batch_create_events': lambda rng: {
+            'events': [
+                {'calendar_id': rng.choice(calendars), 'start': start(rng), 'name': 'Batch event'}
+                for _ in range(10)
+            ]
+        },
+    }
+
+
+async def _session(
+    url: str,
+    principal: str,
+    mix: List[Tuple[str, int]],
+    arguments: Dict[str, Callable[[random.Random], Dict[str, Any]]],
+    rng: random.Random,
+    warmup_until: float,
+    stop_at: float,
+    samples: List[Sample],
+    first_errors: Dict[str, str],
+    result_format: Optional[str] = None
+) -> None:
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    timeout = httpx.Timeout(30.0, read=300.0)
+    async with httpx.AsyncClient(headers={PRINCIPAL_HEADER: principal}, timeout=timeout) as client:
+        async with streamable_http_client(url, http_client=client) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                while time.monotonic() < stop_at:
+                    tool = rng.choices(names, weights)[0]
+                    call_arguments = arguments[tool](rng)
+                    if result_format is not None:
+                        call_arguments['format'] = result_format
+                    started = time.perf_counter()
+                    size = 0
+                    try:
+                        result = await session.call_tool(tool, call_arguments)
+                        ok = not result.isError
+                        if ok:
+                            size = sum(
+                                len(block.text.encode()) for block in result.content
+                                if block.type == 'text'
+                            )
+                        else:
+                            first_errors.setdefault(tool, str(result.content[0].text)[:200])
+                    except McpError as e:
+                        ok = False
+                        first_errors.setdefault(tool, e.error.message[:200])
+                    elapsed = time.perf_counter() - started
+                    if time.monotonic() >= warmup_until:
+                        samples.append((tool, elapsed, ok, size))
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[q - 1]
+
+
+def summarize(samples: List[Sample], duration: float) -> Dict[str, Dict[str, float]]:
+    """
+    Per-tool and overall calls, errors, throughput, latency percentiles (ms) and mean text size
+    of successful results (bytes).
+    """
+    by_tool: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_tool[sample[0]].append(sample)
+        by_tool['(all)'].append(sample)
+
+    summary = {}
+    for tool, tool_samples in sorted(by_tool.items()):
+        latencies = sorted(elapsed * 1000 for _, elapsed, _, _ in tool_samples)
+        sizes = [size for _, _, ok, size in tool_samples if ok]
+        summary[tool] = {
+            'calls': len(tool_samples),
+            'errors': sum(1 for _, _, ok, _ in tool_samples if not ok),
+            'throughput': round(len(tool_samples) / duration, 2),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'p50_ms': round(_percentile(latencies, 50), 3),
+            'p95_ms': round(_percentile(latencies, 95), 3),
+            'p99_ms': round(_percentile(latencies, 99), 3),
+            'mean_bytes': round(statistics.fmean(sizes)) if sizes else 0,
+        }
+
+    return summary
+
+
+async def _drive(
+    args,
+    server_url: str,
+    metrics_url: str
+) -> Tuple[List[Sample], Dict[str, str], Dict, Dict]:
+    mix = parse_mix(args.mix)
+    calendars = calendar_ids(args.calendars)
+    arguments = argument_factory(calendars, args.events)
+    unknown = [name for name, _ in mix if name not in arguments]
+    if unknown:
+        raise SystemExit(f"no argument builder for: {', '.join(unknown)}")
+
+    samples: List[Sample] = []
+    first_errors: Dict[str, str] = {}
+    started = time.monotonic()
+    warmup_until = started + args.warmup
+    stop_at = warmup_until + args.duration
+
+    async def snapshot_after_warmup():
+        await asyncio.sleep(args.warmup)
+        return _stage_totals(await asyncio.to_thread(_get_text, metrics_url))
+
+    sessions = [
+        _session(
+            server_url,
+            f'bench-{i}',
+            mix,
+            arguments,
+            random.Random(args.seed + i),
+            warmup_until,
+            stop_at,
+            samples,
+            first_errors,
+            args.format
+        )
+        for i in range(args.sessions)
+    ]
+    before, *_ = await asyncio.gather(snapshot_after_warmup(), *sessions)
+    after = _stage_totals(await asyncio.to_thread(_get_text, metrics_url))
+    return samples, first_errors, before, after
+
+
+def _touch_events(google_url: str, args, stop: threading.Event) -> None:
+    """
+    Edits random events through the fake API at args.touch_rate per second, as other clients
+    would, until stop is set.
+    """
+    rng = random.Random(args.seed)
+    calendars = calendar_ids(args.calendars)
+    while not stop.wait(1 / args.touch_rate):
+        request = urllib.request.Request(
+            f'{google_url}fake/touch/{rng.choice(calendars)}',
+            data=b'',
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+
+def run(args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix='assistant-mcp-bench-')
+    google_port = args.google_port or _free_port()
+    server_port = args.server_port or _free_port()
+    google_url = f'http://127.0.0.1:{google_port}/'
+    principals = [f'bench-{i}' for i in range(args.sessions)]
+    db_path = os.path.join(workdir, 'bench.db')
+    _seed_tokens(db_path, principals, google_url, args.token_ttl)
+
+    google = subprocess.Popen(
+        [
+            sys.executable, os.path.join(BENCH_DIR, 'fake_google.py'),
+            '--port', str(google_port),
+            '--latency-ms', str(args.latency_ms),
+            '--jitter-ms', str(args.jitter_ms),
+            '--error-rate', str(args.error_rate),
+            '--throttle-rate', str(args.throttle_rate),
+            '--calendars', str(args.calendars),
+            '--events', str(args.events),
+            '--token-ttl', str(args.token_ttl),
+            '--seed', str(args.seed)
+        ],
+        stdout=subprocess.DEVNULL
+    )
+    server = None
+    try:
+        _wait_for(f'{google_url}healthz', google)
+        server_env = {
+            **os.environ,
+            'SERVER_HOST': '127.0.0.1',
+            'SERVER_PORT': str(server_port),
+            'DB_PATH': db_path,
+            'GOOGLE_API_ROOT_URL': google_url,
+            'PRINCIPAL_HEADER': PRINCIPAL_HEADER,
+            'PYTHONPATH': SRC_DIR
+        }
+        if args.push:
+            server_env['GOOGLE_WEBHOOK_URL'] = (
+                f'http://127.0.0.1:{server_port}/google/notifications'
+            )
+        with open(os.path.join(workdir, 'server.log'), 'w') as log:
+            server = subprocess.Popen(
+                [sys.executable, 'main.py'],
+                cwd=SRC_DIR,
+                env=server_env,
+                stdout=log,
+                stderr=subprocess.STDOUT
+            )
+        metrics_url = f'http://127.0.0.1:{server_port}/metrics'
+        _wait_for(metrics_url, server)
+
+        stop_touching = threading.Event()
+        if args.touch_rate > 0:
+            threading.Thread(
+                target=_touch_events,
+                args=(google_url, args, stop_touching),
+                daemon=True
+            ).start()
+        try:
+            samples, first_errors, before, after = asyncio.run(
+                _drive(args, f'http://127.0.0.1:{server_port}/mcp', metrics_url)
+            )
+        finally:
+            stop_touching.set()
+        memory = _read_memory(server.pid)
+        google_stats = json.loads(_get_text(f'{google_url}stats'))
+    finally:
+        for process in (server, google):
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    tools = summarize(samples, args.duration)
+    calls = max(tools.get('(all)', {}).get('calls', 0), 1)
+    return {
+        'config': {
+            key: getattr(args, key)
+            for key in (
+                'sessions', 'duration', 'warmup', 'mix', 'latency_ms', 'jitter_ms',
+                'error_rate', 'throttle_rate', 'calendars', 'events', 'token_ttl', 'seed',
+                'format', 'push', 'touch_rate'
+            )
+        },
+        'tools': tools,
+        'first_errors': first_errors,
+        'stages_ms': _stage_means(before, after),
+        'memory': memory,
+        'google': {
+            **google_stats,
+            'requests_per_call': round(sum(google_stats['requests'].values()) / calls, 3)
+        },
+        'workdir': workdir
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"{'tool':<22}{'calls':>8}{'errors':>8}{'calls/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bytes':>10}")
+    for tool, row in result['tools'].items():
+        print(f"{tool:<22}{row['calls']:>8}{row['errors']:>8}{row['throughput']:>10}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+              f"{row['mean_bytes']:>10}")
+
+    print("\nstage means (ms): " + ', '.join(
+        f"{stage} {mean}" for stage, mean in result['stages_ms'].items()
+    ))
+    memory = result['memory']
+    if memory['peak_rss_kib'] is not None:
+        print(f"server memory: rss {memory['rss_kib'] / 1024:.1f} MiB, "
+              f"peak {memory['peak_rss_kib'] / 1024:.1f} MiB")
+    print(f"google requests per tool call: {result['google']['requests_per_call']}")
+    if result['google'].get('notifications'):
+        print("push notifications: " + ', '.join(
+            f"{outcome} {count}" for outcome, count in result['google']['notifications'].items()
+        ))
+    for tool, error in result['first_errors'].items():
+        print(f"first {tool} error: {error}")
+    print(f"server log: {os.path.join(result['workdir'], 'server.log')}")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> bool:
+    """
+    Prints baseline vs current for latency, throughput and stage timings. Returns whether any
+    of them regressed by more than threshold (a fraction).
+    """
+    regressed = False
+    changed = sorted(
+        key for key, value in current['config'].items()
+        if baseline['config'].get(key) != value
+    )
+    if changed:
+        print(f"  note: settings differ from the baseline: {', '.join(changed)}")
+
+    def line(label: str, old: float, new: float, higher_is_worse: bool = True) -> None:
+        nonlocal regressed
+        change = (new - old) / old if old else 0.0
+        worse = change > threshold if higher_is_worse else change < -threshold
+        regressed |= worse
+        flag = '  REGRESSION' if worse else ''
+        print(f"  {label:<28}{old:>12}{new:>12}{change:>+10.1%}{flag}")
+
+    print(f"  {'':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for tool, row in current['tools'].items():
+        old = baseline['tools'].get(tool)
+        if old is None:
+            continue
+        print(tool)
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            line(key, old[key], row[key])
+        line('throughput', old['throughput'], row['throughput'], higher_is_worse=False)
+        if 'mean_bytes' in old:
+            line('mean_bytes', old['mean_bytes'], row['mean_bytes'])
+
+    print('stages (mean ms)')
+    for stage, mean in current['stages_ms'].items():
+        if stage in baseline['stages_ms']:
+            line(stage, baseline['stages_ms'][stage], mean)
+
+    old_peak = baseline['memory'].get('peak_rss_kib')
+    new_peak = current['memory'].get('peak_rss_kib')
+    if old_peak and new_peak:
+        print('memory')
+        line('peak_rss_kib', old_peak, new_peak)
+
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=8, help='concurrent MCP sessions')
+    parser.add_argument('--duration', type=float, default=20.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=3.0, help='unmeasured seconds first')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='tool=weight,... to call')
+    parser.add_argument('--format', choices=('json', 'compact'),
+                        help="result format passed to every call (default: the tools' default)")
+    parser.add_argument('--push', action='store_true',
+                        help='watch calendars through push notifications instead of polling')
+    parser.add_argument('--touch-rate', type=float, default=0.0,
+                        help='events edited behind the server per second')
+    parser.add_argument('--server-port', type=int, default=0)
+    parser.add_argument('--google-port', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative change that counts as a regression (default: 0.10)')
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.token_ttl < MIN_TOKEN_TTL:
+        parser.error(f"--token-ttl must be at least {MIN_TOKEN_TTL}s")
+
+    result = run(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\ncompared with {args.compare}:")
+        if compare(baseline, result, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
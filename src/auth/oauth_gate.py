@@ -2,53 +2,66 @@
 Constructs a function representing the OAuth gate, separating auth layers from tool logic. Serves
 to store logic related to the OAuth gate within the auth module.
 
-Called within OAuthToolApp's run_method (mcp_tools.auth_tool_app)
+Called within OAuthToolApp's call_tool (mcp_tools.auth_tool_app)
 """
 
-import os
 import uuid
-from typing import Sequence, Dict, Any, Callable
+from contextvars import ContextVar
+from typing import Sequence, Dict, Any, Optional
 from auth.providers.provider import OAuthProvider
+from auth.tokens.auth_token import OAuthToken
+from db.db import get_store
+from utils.concurrency import run_blocking
 from utils.errors import OAuthRequiredError
+from utils.metrics import stage
 
-elicitation_mapping = {}
-callback_state = {}
+# principal the current tool call runs as, for per-principal pools and caches downstream
+current_principal_id: ContextVar[Optional[str]] = ContextVar('current_principal_id', default=None)
 
-def ensure_auth(
+async def authorize(
     provider: OAuthProvider,
-    method: Callable,
-    ctx: Dict[str, Any],
-    scopes: Sequence[str],
-    **kwargs
-):
-    """
-    Docstring for retrieve_auth_token
-    
-    :param provider: Description
-    :type provider: OAuthProvider
-    :param method: Description
-    :type method: Callable
-    :param ctx: Description
-    :type ctx: Dict[str, Any]
-    :param principal_id: Description
-    :type principal_id: str
-    :param scopes: Description
-    :type scopes: Sequence[str]
-    :param kwargs: Description
-    """
-    principal_id = 'localtest'
-    token = provider.get_access_token(principal_id, scopes)
+    principal_id: str,
+    scopes: Sequence[str]
+) -> OAuthToken:
+    """
+    Returns the principal's token for scopes and marks the principal as the current one, or
+    records an elicitation and raises OAuthRequiredError when there is no usable token.
+    """
+    with stage('auth_lookup', provider=provider.name):
+        token = provider.get_cached_token(principal_id, scopes)
+        if token is None:
+            token = await run_blocking(provider.get_access_token, principal_id, scopes)
     if token is not None:
-        kwargs['token'] = token
-        return method(ctx=ctx, **kwargs)
-    
-    elicitation_id = str(uuid.uuid4())
-    elicitation_mapping[elicitation_id] = {
-        'provider_name': provider.name, 
-        'scopes': scopes
-    }
+        current_principal_id.set(principal_id)
+        return token
+
+    elicitation_id = await run_blocking(
+        get_store().put_elicitation, str(uuid.uuid4()), principal_id, provider.name, scopes
+    )
 
     raise OAuthRequiredError(
         message='OAuth required',
         elicitation_id=elicitation_id
     )
+
+
+async def get_elicitation(elicitation_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Looks up a pending elicitation (provider_name, scopes, principal_id, callback_state). Returns
+    None once it has expired or completed.
+    """
+    return await run_blocking(get_store().get_elicitation, elicitation_id)
+
+
+async def save_callback_state(elicitation_id: str, provider_state: Dict[str, Any]) -> None:
+    """
+    Stores the provider's OAuth state for an elicitation until its callback arrives.
+    """
+    await run_blocking(get_store().put_callback_state, elicitation_id, provider_state)
+
+
+async def complete_elicitation(elicitation_id: str) -> None:
+    """
+    Drops an elicitation once its OAuth callback has stored the token.
+    """
+    await run_blocking(get_store().delete_elicitation, elicitation_id)
@@ -0,0 +1,66 @@
+"""
+Resolves which principal (end user) a tool call runs as. Tokens, token refresh, client pools
+and caches are all keyed by the resolved principal_id.
+
+Resolution order:
+    1. the PRINCIPAL_CLAIM claim of the MCP access token, when the server runs with MCP
+       authorization. The token verifier must return an AccessToken (subclass) carrying the
+       claim, as the model itself only names the OAuth client. Setting PRINCIPAL_CLAIM to
+       'client_id' keys principals on the client instead, which assumes one user per client.
+    2. the PRINCIPAL_HEADER request header, when configured (e.g. set by a trusted proxy, or
+       'mcp-session-id' for one principal per MCP session). A call without it is rejected.
+    3. DEFAULT_PRINCIPAL, for single-user local setups (stdio, dev) with neither MCP
+       authorization nor PRINCIPAL_HEADER
+"""
+
+import os
+from typing import Any, Optional
+from mcp.server.auth.middleware.auth_context import get_access_token
+from utils.env import load_env
+from utils.errors import PrincipalNotFoundError
+
+load_env()
+PRINCIPAL_CLAIM = os.getenv('PRINCIPAL_CLAIM', 'sub')
+PRINCIPAL_HEADER = os.getenv('PRINCIPAL_HEADER')
+DEFAULT_PRINCIPAL = os.getenv('DEFAULT_PRINCIPAL', 'localtest')
+
+
+def _request_header(ctx: Any, header: str) -> Optional[str]:
+    try:
+        request = ctx.request_context.request
+    except (AttributeError, ValueError):
+        # no MCP request context, e.g. a direct call outside a tool invocation
+        return None
+
+    headers = getattr(request, 'headers', None)
+    return headers.get(header) if headers is not None else None
+
+
+def _token_claim(access_token: Any, claim: str) -> Optional[str]:
+    value = getattr(access_token, claim, None)
+    if value is None:
+        value = (getattr(access_token, 'model_extra', None) or {}).get(claim)
+    return str(value) if value else None
+
+
+def resolve_principal(ctx: Any) -> str:
+    access_token = get_access_token()
+    if access_token is not None:
+        principal_id = _token_claim(access_token, PRINCIPAL_CLAIM)
+        if principal_id is None:
+            # never fall back to a shared principal for an authenticated caller
+            raise PrincipalNotFoundError(
+                f"MCP access token has no '{PRINCIPAL_CLAIM}' claim to identify the user"
+            )
+        return principal_id
+
+    if PRINCIPAL_HEADER:
+        principal_id = _request_header(ctx, PRINCIPAL_HEADER)
+        if not principal_id:
+            # the default principal holds the local (legacy) token, so it is never a fallback
+            raise PrincipalNotFoundError(
+                f"request has no '{PRINCIPAL_HEADER}' header to identify the user"
+            )
+        return principal_id
+
+    return DEFAULT_PRINCIPAL
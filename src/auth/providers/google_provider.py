@@ -4,18 +4,38 @@ Provides implementations for Google OAuth providers. Serves as an abstraction la
 
 import os
 import os.path
-from typing import Sequence, Union, Optional, Dict
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence, Union, Optional, Dict, Any, Set
+from auth.principal import DEFAULT_PRINCIPAL
 from auth.providers.provider import OAuthProvider, LocalRedirectWSGIApp
 from auth.tokens.google_token import GoogleToken
+from auth.tokens.token_cache import TokenCache
 from utils.errors import OAuthRequiredError
+from utils.locks import KeyedLocks
+from utils.files import WatchedJSONFile
+from utils.metrics import stage
+from db.db import TokenStore, get_store
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
-from dotenv import load_dotenv
+from google.auth.exceptions import RefreshError
+from google.auth._helpers import REFRESH_THRESHOLD
+from utils.env import load_env
 
-load_dotenv()
+load_env()
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 GOOGLE_SECRETS_PATH = os.getenv("GOOGLE_SECRETS_PATH")
 GOOGLE_LOCAL_TOKEN_PATH = os.getenv("GOOGLE_LOCAL_TOKEN_PATH")
+TOKEN_STORE_POLL_SECONDS = float(os.getenv("TOKEN_STORE_POLL_SECONDS", 5))
+TOKEN_REFRESH_MARGIN = float(os.getenv("TOKEN_REFRESH_MARGIN", 600))
+TOKEN_REFRESH_INTERVAL = float(os.getenv("TOKEN_REFRESH_INTERVAL", 30))
+TOKEN_REFRESH_WORKERS = int(os.getenv("TOKEN_REFRESH_WORKERS", 4))
+CLIENT_SECRETS_POLL_SECONDS = float(os.getenv("CLIENT_SECRETS_POLL_SECONDS", 5))
+
+logger = logging.getLogger(__name__)
 
 
 class GoogleProvider(OAuthProvider):
@@ -24,45 +44,220 @@ class GoogleProvider(OAuthProvider):
 
     Primarily used for local dev testing.
     """
-    def __init__(self):
+    def __init__(self, store: Optional[TokenStore] = None):
         self.local_server = None
         self.redirect_app = None
+        self._store = store if store is not None else get_store()
+        self._lock = threading.Lock()
+        self._token_cache = TokenCache(stale_margin=REFRESH_THRESHOLD.total_seconds())
+        self._token_infos: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._token_versions: Dict[str, Optional[int]] = {}
+        self._next_poll: Dict[str, float] = {}
+        self._principal_locks = KeyedLocks()
+        self._refresher: Optional[threading.Thread] = None
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+        self._refreshing: Set[str] = set()
+        self._client_secrets = (
+            WatchedJSONFile(
+                GOOGLE_SECRETS_PATH,
+                poll_seconds=CLIENT_SECRETS_POLL_SECONDS,
+                validate=_validate_client_config
+            )
+            if GOOGLE_SECRETS_PATH else None
+        )
+        self._import_legacy_token_file()
 
     @property
     def name(self):
         return "google"
 
+    def _import_legacy_token_file(self) -> None:
+        """
+        One-time import of a GOOGLE_LOCAL_TOKEN_PATH token into the store, for the default
+        (local) principal.
+        """
+        if not GOOGLE_LOCAL_TOKEN_PATH or not os.path.exists(GOOGLE_LOCAL_TOKEN_PATH):
+            return
+        if self._store.token_version(DEFAULT_PRINCIPAL, self.name) is not None:
+            return
+
+        with open(GOOGLE_LOCAL_TOKEN_PATH) as token_file:
+            self._store.put_token(DEFAULT_PRINCIPAL, self.name, token_file.read())
+
+    def _sync_token(self, principal_id: str) -> None:
+        """
+        Re-reads a principal's token only if its version in the store changed since the last
+        read. Changes made by other processes drop the principal's cached tokens.
+        """
+        self._next_poll[principal_id] = time.monotonic() + TOKEN_STORE_POLL_SECONDS
+        version = self._store.token_version(principal_id, self.name)
+        if principal_id in self._token_versions and version == self._token_versions[principal_id]:
+            return
+
+        record = self._store.get_token(principal_id, self.name) if version is not None else None
+        self._token_cache.invalidate(principal_id)
+        self._token_infos[principal_id] = json.loads(record[0]) if record is not None else None
+        self._token_versions[principal_id] = record[1] if record is not None else None
+
+    def _write_token(self, principal_id: str, creds: Credentials) -> None:
+        token_json = creds.to_json()
+        version = self._store.put_token(principal_id, self.name, token_json)
+
+        # record our own write so the next poll doesn't treat it as an outside change
+        self._token_infos[principal_id] = json.loads(token_json)
+        self._token_versions[principal_id] = version
+
+    def _forget_token(self, principal_id: str) -> None:
+        """
+        Drops a principal's token for good (its refresh token was rejected), so it stops being
+        refreshed and the next call asks the user to authorize again. A token another process
+        wrote in the meantime is kept.
+        """
+        version = self._store.token_version(principal_id, self.name)
+        if version == self._token_versions.get(principal_id):
+            self._store.delete_token(principal_id, self.name)
+        self._token_cache.invalidate(principal_id)
+        self._token_infos[principal_id] = None
+        self._token_versions[principal_id] = None
+
     def _get_stored_token(self, principal_id, scopes) -> Optional[GoogleToken]:
-        if os.path.exists(GOOGLE_LOCAL_TOKEN_PATH):
-            creds = Credentials.from_authorized_user_file(GOOGLE_LOCAL_TOKEN_PATH, scopes)
+        token_info = self._token_infos.get(principal_id)
+        if token_info is not None:
+            creds = Credentials.from_authorized_user_info(token_info, scopes)
             return GoogleToken(creds)
         
         return None
+
+    def _principal_lock(self, principal_id: str) -> threading.Lock:
+        return self._principal_locks.get(principal_id)
+
+    def _refresh_token(
+        self,
+        principal_id: str,
+        scopes: Sequence[str],
+        margin: float
+    ) -> Optional[GoogleToken]:
+        """
+        Single-flight refresh: at most one refresh per principal runs at a time, and callers
+        queued behind it pick up its result instead of refreshing again. Only refreshes if the
+        token expires within margin seconds.
+        """
+        with self._principal_lock(principal_id):
+            entry = self._token_cache.get(principal_id, scopes)
+            if entry is not None:
+                token = entry.token
+            else:
+                token = self._get_stored_token(principal_id, scopes)
+                if token is None:
+                    return None
+                entry = self._token_cache.put(principal_id, scopes, token)
+
+            if token.is_valid and entry.expires_at - time.time() > margin:
+                return token
+            if not token.can_refresh:
+                return token if token.is_valid and not token.is_stale else None
+
+            # refresh a copy, so in-flight calls keep using the still valid credentials
+            refreshed = GoogleToken(
+                Credentials.from_authorized_user_info(json.loads(token.creds.to_json()), scopes)
+            )
+            try:
+                with stage('token_refresh', provider=self.name):
+                    refreshed.refresh()
+            except RefreshError as e:
+                if not _is_invalid_grant(e):
+                    raise
+                logger.warning("refresh token of %s was revoked or expired", principal_id)
+                self._forget_token(principal_id)
+                return None
+            self._write_token(principal_id, refreshed.creds)
+            self._token_cache.put(principal_id, scopes, refreshed)
+
+            return refreshed
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+
+        with self._lock:
+            if self._refresher is None:
+                self._refresh_pool = ThreadPoolExecutor(
+                    max_workers=TOKEN_REFRESH_WORKERS,
+                    thread_name_prefix='google-token-refresh'
+                )
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop,
+                    name='google-token-refresher',
+                    daemon=True
+                )
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        """
+        Renews cached tokens TOKEN_REFRESH_MARGIN seconds before they expire, so tool calls
+        never wait on Google's token endpoint. Refreshes run on a small pool, so one principal's
+        slow refresh doesn't hold up the rest.
+        """
+        while True:
+            time.sleep(TOKEN_REFRESH_INTERVAL)
+            now = time.time()
+            for (principal_id, scopes), entry in self._token_cache.entries():
+                if entry.expires_at - now > TOKEN_REFRESH_MARGIN:
+                    continue
+                with self._lock:
+                    if principal_id in self._refreshing:
+                        continue
+                    self._refreshing.add(principal_id)
+                self._refresh_pool.submit(self._background_refresh, principal_id, scopes)
+
+    def _background_refresh(self, principal_id: str, scopes: Sequence[str]) -> None:
+        try:
+            self._refresh_token(principal_id, scopes, TOKEN_REFRESH_MARGIN)
+        except Exception:
+            logger.exception("background token refresh failed for %s", principal_id)
+        finally:
+            with self._lock:
+                self._refreshing.discard(principal_id)
+
+    def get_cached_token(self, principal_id: str, scopes: Sequence[str]) -> Optional[GoogleToken]:
+        """
+        Returns a cached token that is still fresh, without locking or touching disk.
+        """
+        if time.monotonic() >= self._next_poll.get(principal_id, 0.0):
+            return None
+
+        entry = self._token_cache.get(principal_id, scopes)
+        if entry is not None and entry.is_fresh():
+            return entry.token
+
+        return None
     
     def get_access_token(self, principal_id: str, scopes: Sequence[str]) -> Optional[GoogleToken]:
         """
         Get valid token or return None.
         """
-        token = self._get_stored_token(principal_id, scopes)
-        if token is not None and token.is_valid:
-            if not token.is_stale:
-                return token
-            if token.can_refresh:
-                token.refresh()
-                with open(GOOGLE_LOCAL_TOKEN_PATH, 'w') as new_token:
-                    new_token.write(token.creds.to_json())
-            
-                return token
-        
-        # refresh if we can
-        if token is not None and token.can_refresh:
-            token.refresh()
-            with open(GOOGLE_LOCAL_TOKEN_PATH, 'w') as new_token:
-                new_token.write(token.creds.to_json())
-        
-            return token
-        
-        return None
+        if time.monotonic() >= self._next_poll.get(principal_id, 0.0):
+            with self._principal_lock(principal_id):
+                self._sync_token(principal_id)
+
+        entry = self._token_cache.get(principal_id, scopes)
+        if entry is not None and entry.is_fresh():
+            return entry.token
+
+        token = self._refresh_token(principal_id, scopes, self._token_cache.stale_margin)
+        if token is not None:
+            self._ensure_refresher()
+
+        return token
+
+    def _flow(self, scopes: Sequence[str], **flow_kwargs) -> Flow:
+        """
+        Builds an OAuth flow from the in-memory client secrets, without touching disk.
+        """
+        if self._client_secrets is None:
+            raise RuntimeError("GOOGLE_SECRETS_PATH is not set")
+
+        return Flow.from_client_config(self._client_secrets.data, scopes=scopes, **flow_kwargs)
 
     def generate_auth_url(
         self,
@@ -72,7 +267,7 @@ class GoogleProvider(OAuthProvider):
         trailing_slash=True,
         **auth_kwargs
     ):
-        flow = Flow.from_client_secrets_file(GOOGLE_SECRETS_PATH, scopes=scopes)
+        flow = self._flow(scopes)
         fmt = "{}/auth/callback/" if trailing_slash else "{}/auth/callback"
         redirect_uri = fmt.format(proxy_origin, elicitation_id)
         flow.redirect_uri = redirect_uri
@@ -93,12 +288,12 @@ class GoogleProvider(OAuthProvider):
         }
     
     def finish_auth(self, provider_state: Dict, uri):
+        """
+        Exchanges the callback's authorization code for a token and stores it. Blocking; run it
+        on the worker pool.
+        """
         # restore flow
-        flow = Flow.from_client_secrets_file(
-            client_secrets_file=GOOGLE_SECRETS_PATH,
-            scopes=provider_state['scopes'],
-            state=provider_state['state']
-        )
+        flow = self._flow(provider_state['scopes'], state=provider_state['state'])
         flow.redirect_uri = provider_state['redirect_uri']
 
         # Note: using https here because oauthlib is very picky that
@@ -110,8 +305,27 @@ class GoogleProvider(OAuthProvider):
         flow.fetch_token(authorization_response=authorization_response)
         creds = flow.credentials
 
-        with open(GOOGLE_LOCAL_TOKEN_PATH, 'w') as new_token:
-            new_token.write(creds.to_json())
+        principal_id = provider_state.get('principal_id', DEFAULT_PRINCIPAL)
+        with self._principal_lock(principal_id):
+            self._write_token(principal_id, creds)
+            self._token_cache.invalidate(principal_id)
+
+
+def _is_invalid_grant(error: RefreshError) -> bool:
+    """
+    Whether Google rejected the refresh token itself (revoked, expired or password changed),
+    which no retry will fix.
+    """
+    response = error.args[1] if len(error.args) > 1 else None
+    return isinstance(response, dict) and response.get('error') == 'invalid_grant'
+
+
+def _validate_client_config(client_config) -> None:
+    """
+    Rejects client secrets that Flow can't be built from, so a bad edit doesn't replace a good
+    config.
+    """
+    Flow.from_client_config(client_config, scopes=SCOPES)
 
 
 def create_google_provider():
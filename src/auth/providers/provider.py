@@ -49,6 +49,13 @@ class OAuthProvider(ABC):
     def get_access_token(self, principal_id: str, scopes: Sequence[str]):
         pass
 
+    def get_cached_token(self, principal_id: str, scopes: Sequence[str]) -> Optional[OAuthToken]:
+        """
+        Non-blocking lookup of an in-memory token that needs no I/O to hand out. Providers
+        without a cache return None, and callers fall back to get_access_token.
+        """
+        return None
+
     @abstractmethod
     def finish_auth(self, provider_state: Dict, uri):
         pass
@@ -1,20 +1,49 @@
 """
 Registry for different providers, to support dynamic retrieval of providers.
 
-Providers should be one-time initialized.
+Providers are registered as "module:factory" paths and created once, on the first get_provider
+call, so importing the registry doesn't pull in any provider's client libraries.
 """
 
-from auth.providers.google_provider import create_google_provider
+import threading
+from importlib import import_module
+from typing import Callable, Dict, Union
 from auth.providers.provider import OAuthProvider
 
-GOOGLE_PROVIDER = create_google_provider()
+ProviderFactory = Union[str, Callable[[], OAuthProvider]]
 
-PROVIDER_REGISTRY = {
-    'google': GOOGLE_PROVIDER
+PROVIDER_REGISTRY: Dict[str, ProviderFactory] = {
+    'google': 'auth.providers.google_provider:create_google_provider'
 }
 
+_providers: Dict[str, OAuthProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def register_provider(provider_name: str, factory: ProviderFactory) -> None:
+    PROVIDER_REGISTRY[provider_name] = factory
+
+
+def _resolve_factory(factory: ProviderFactory) -> Callable[[], OAuthProvider]:
+    if not isinstance(factory, str):
+        return factory
+
+    module_name, attribute = factory.split(':')
+    return getattr(import_module(module_name), attribute)
+
+
 def get_provider(provider_name: str) -> OAuthProvider:
+    provider = _providers.get(provider_name)
+    if provider is not None:
+        return provider
+
     if PROVIDER_REGISTRY.get(provider_name) is None:
         raise RuntimeError("provider not found")
 
-    return PROVIDER_REGISTRY[provider_name]
\ No newline at end of file
+    with _providers_lock:
+        provider = _providers.get(provider_name)
+        if provider is None:
+            factory = _resolve_factory(PROVIDER_REGISTRY[provider_name])
+            provider = _providers[provider_name] = factory()
+
+    return provider
@@ -31,4 +31,9 @@ class OAuthToken(ABC):
 
     @abstractmethod
     def present_creds(self):
+        pass
+
+    @property
+    @abstractmethod
+    def expires_at(self):
         pass
\ No newline at end of file
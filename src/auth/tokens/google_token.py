@@ -2,6 +2,8 @@
 Docstring for auth.tokens.google_token
 """
 
+from typing import Optional
+from datetime import timezone
 from .auth_token import OAuthToken
 from google.auth.credentials import TokenState
 from google.oauth2.credentials import Credentials
@@ -37,4 +39,13 @@ class GoogleToken(OAuthToken):
         self.creds = creds
 
     def present_creds(self) -> Credentials:
-        return self.creds
\ No newline at end of file
+        return self.creds
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """
+        Access token expiry as epoch seconds, or None if Google did not report one.
+        """
+        if self.creds.expiry is None:
+            return None
+        return self.creds.expiry.replace(tzinfo=timezone.utc).timestamp()
\ No newline at end of file
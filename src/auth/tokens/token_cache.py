@@ -0,0 +1,86 @@
+"""
+Provides an in-memory cache of live OAuth tokens, keyed by principal and scopes. Lets providers
+answer hot-path token lookups without touching disk or re-deriving token state.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.locks import ShardedMutex
+from .auth_token import OAuthToken
+
+CacheKey = Tuple[str, Tuple[str, ...]]
+
+
+def cache_key(principal_id: str, scopes: Sequence[str]) -> CacheKey:
+    return principal_id, tuple(sorted(scopes))
+
+
+class CachedToken:
+    """
+    A cached token with its freshness window precomputed as epoch seconds.
+    """
+    __slots__ = ('token', 'fresh_until', 'expires_at')
+
+    def __init__(self, token: OAuthToken, stale_margin: float):
+        expires_at = token.expires_at
+        self.token = token
+        self.expires_at = expires_at if expires_at is not None else float('inf')
+        self.fresh_until = self.expires_at - stale_margin
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.fresh_until
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= self.expires_at
+
+
+class TokenCache:
+    """
+    Maps (principal_id, scopes) to the live token last handed out for it. Principals are spread
+    over shards with their own lock, so writes for one principal never wait on another's; reads
+    are plain dict lookups and take no lock.
+    """
+    def __init__(self, stale_margin: float, shards: Optional[int] = None):
+        self.stale_margin = stale_margin
+        self._locks = ShardedMutex(shards) if shards is not None else ShardedMutex()
+        self._shards: List[Dict[str, Dict[Tuple[str, ...], CachedToken]]] = [
+            {} for _ in range(len(self._locks))
+        ]
+
+    def get(self, principal_id: str, scopes: Sequence[str]) -> Optional[CachedToken]:
+        tokens = self._shards[self._locks.index(principal_id)].get(principal_id)
+        if tokens is None:
+            return None
+
+        _, scope_key = cache_key(principal_id, scopes)
+        return tokens.get(scope_key)
+
+    def put(self, principal_id: str, scopes: Sequence[str], token: OAuthToken) -> CachedToken:
+        entry = CachedToken(token, self.stale_margin)
+        _, scope_key = cache_key(principal_id, scopes)
+        index = self._locks.index(principal_id)
+        with self._locks.at(index):
+            self._shards[index].setdefault(principal_id, {})[scope_key] = entry
+
+        return entry
+
+    def invalidate(self, principal_id: Optional[str] = None) -> None:
+        if principal_id is not None:
+            index = self._locks.index(principal_id)
+            with self._locks.at(index):
+                self._shards[index].pop(principal_id, None)
+            return
+
+        for index, shard in enumerate(self._shards):
+            with self._locks.at(index):
+                shard.clear()
+
+    def entries(self) -> List[Tuple[CacheKey, CachedToken]]:
+        result = []
+        for index, shard in enumerate(self._shards):
+            with self._locks.at(index):
+                for principal_id, tokens in shard.items():
+                    for scope_key, entry in tokens.items():
+                        result.append(((principal_id, scope_key), entry))
+
+        return result
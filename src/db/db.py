@@ -0,0 +1,342 @@
+"""
+Provides the persistent store for OAuth tokens and in-flight elicitations. Tokens and pending
+OAuth flows live here rather than in process memory, so several server processes can share
+them and a restart doesn't lose them.
+
+SQLite (WAL mode, pooled connections) is the default backend. Other backends implement
+TokenStore and are registered with register_store_backend.
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+from cryptography.fernet import Fernet
+from utils.env import load_env
+from utils.files import create_text_exclusive
+
+load_env()
+STORE_BACKEND = os.getenv('STORE_BACKEND', 'sqlite')
+DB_PATH = os.getenv('DB_PATH', 'assistant_mcp.db')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))
+TOKEN_ENCRYPTION_KEY = os.getenv('TOKEN_ENCRYPTION_KEY')
+ELICITATION_TTL = float(os.getenv('ELICITATION_TTL', 600))
+ELICITATION_MAX_PENDING = int(os.getenv('ELICITATION_MAX_PENDING', 10000))
+
+
+class TokenStore(ABC):
+    """
+    Provides a parent interface for token and elicitation storage backends.
+
+    Token blobs are keyed by (principal_id, provider) and carry a version that increases on every
+    write, so processes can cheaply tell when another process refreshed a token. Elicitations
+    are keyed by elicitation_id, expire after ELICITATION_TTL seconds, and are coalesced per
+    (principal_id, provider, scopes).
+    """
+    @abstractmethod
+    def get_token(self, principal_id: str, provider: str) -> Optional[Tuple[str, int]]:
+        pass
+
+    @abstractmethod
+    def token_version(self, principal_id: str, provider: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def put_token(self, principal_id: str, provider: str, token_json: str) -> int:
+        pass
+
+    @abstractmethod
+    def delete_token(self, principal_id: str, provider: str) -> None:
+        pass
+
+    @abstractmethod
+    def put_elicitation(
+        self,
+        elicitation_id: str,
+        principal_id: str,
+        provider: str,
+        scopes: Sequence[str]
+    ) -> str:
+        """
+        Records a pending elicitation and returns its id. If one is already pending for the same
+        principal, provider, and scopes, its id is returned instead and its expiry is extended.
+        """
+        pass
+
+    @abstractmethod
+    def get_elicitation(self, elicitation_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def put_callback_state(self, elicitation_id: str, state: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def delete_elicitation(self, elicitation_id: str) -> None:
+        pass
+
+
+class TokenCipher:
+    """
+    Fernet encryption for token blobs. Uses TOKEN_ENCRYPTION_KEY, or a key file next to the
+    database that is generated on first use.
+    """
+    def __init__(self, key: Optional[str], key_path: str):
+        if key is None:
+            key = self._load_or_create_key(key_path)
+        self._fernet = Fernet(key)
+
+    @staticmethod
+    def _load_or_create_key(key_path: str) -> str:
+        if not os.path.exists(key_path):
+            # processes starting together race here; the first key written is everyone's key
+            create_text_exclusive(key_path, Fernet.generate_key().decode())
+
+        with open(key_path) as key_file:
+            return key_file.read().strip()
+
+    def encrypt(self, data: str) -> bytes:
+        return self._fernet.encrypt(data.encode())
+
+    def decrypt(self, blob: bytes) -> str:
+        return self._fernet.decrypt(blob).decode()
+
+
+class SQLiteConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared across worker threads. A connection is used by
+    one thread at a time.
+    """
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self._created = 0
+        self._lock = threading.Lock()
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    conn = self._connect()
+            if conn is None:
+                conn = self._idle.get()
+
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+
+class SQLiteTokenStore(TokenStore):
+    """
+    SQLite-backed TokenStore. Safe to share between processes on one host through WAL mode.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tokens (
+            principal_id TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            blob BLOB NOT NULL,
+            version INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (principal_id, provider)
+        );
+        CREATE TABLE IF NOT EXISTS elicitations (
+            elicitation_id TEXT PRIMARY KEY,
+            principal_id TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            scopes TEXT NOT NULL,
+            callback_state BLOB,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            UNIQUE (principal_id, provider, scopes)
+        );
+        CREATE INDEX IF NOT EXISTS elicitations_expiry ON elicitations (expires_at);
+    """
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self,
+        path: str = DB_PATH,
+        pool_size: int = DB_POOL_SIZE,
+        elicitation_ttl: float = ELICITATION_TTL,
+        max_pending: int = ELICITATION_MAX_PENDING
+    ):
+        self.pool = SQLiteConnectionPool(path, pool_size)
+        self.cipher = TokenCipher(TOKEN_ENCRYPTION_KEY, f"{path}.key")
+        self.elicitation_ttl = elicitation_ttl
+        self.max_pending = max_pending
+        with self.pool.connection() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                # pending elicitations are short-lived, so older layouts are dropped, not migrated
+                conn.execute('DROP TABLE IF EXISTS elicitations')
+            conn.executescript(self.SCHEMA)
+            conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+
+    def get_token(self, principal_id: str, provider: str) -> Optional[Tuple[str, int]]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT blob, version FROM tokens WHERE principal_id = ? AND provider = ?',
+                (principal_id, provider)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return self.cipher.decrypt(row[0]), row[1]
+
+    def token_version(self, principal_id: str, provider: str) -> Optional[int]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT version FROM tokens WHERE principal_id = ? AND provider = ?',
+                (principal_id, provider)
+            ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def put_token(self, principal_id: str, provider: str, token_json: str) -> int:
+        blob = self.cipher.encrypt(token_json)
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                """
+                INSERT INTO tokens (principal_id, provider, blob, version, updated_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (principal_id, provider) DO UPDATE SET
+                    blob = excluded.blob,
+                    version = tokens.version + 1,
+                    updated_at = excluded.updated_at
+                RETURNING version
+                """,
+                (principal_id, provider, blob, time.time())
+            ).fetchone()
+
+        return row[0]
+
+    def delete_token(self, principal_id: str, provider: str) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                'DELETE FROM tokens WHERE principal_id = ? AND provider = ?',
+                (principal_id, provider)
+            )
+
+    def put_elicitation(
+        self,
+        elicitation_id: str,
+        principal_id: str,
+        provider: str,
+        scopes: Sequence[str]
+    ) -> str:
+        now = time.time()
+        with self.pool.connection() as conn:
+            # expired rows are cleared first so they can't be coalesced into
+            conn.execute('DELETE FROM elicitations WHERE expires_at <= ?', (now,))
+            row = conn.execute(
+                """
+                INSERT INTO elicitations
+                    (elicitation_id, principal_id, provider, scopes, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (principal_id, provider, scopes) DO UPDATE SET
+                    expires_at = excluded.expires_at
+                RETURNING elicitation_id
+                """,
+                (
+                    elicitation_id,
+                    principal_id,
+                    provider,
+                    json.dumps(sorted(scopes)),
+                    now,
+                    now + self.elicitation_ttl
+                )
+            ).fetchone()
+            # beyond the cap, the elicitations closest to expiry are dropped
+            conn.execute(
+                """
+                DELETE FROM elicitations WHERE elicitation_id IN (
+                    SELECT elicitation_id FROM elicitations
+                    ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_pending,)
+            )
+
+        return row[0]
+
+    def get_elicitation(self, elicitation_id: str) -> Optional[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT principal_id, provider, scopes, callback_state
+                FROM elicitations WHERE elicitation_id = ? AND expires_at > ?
+                """,
+                (elicitation_id, time.time())
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        principal_id, provider, scopes, callback_state = row
+        return {
+            'elicitation_id': elicitation_id,
+            'principal_id': principal_id,
+            'provider_name': provider,
+            'scopes': json.loads(scopes),
+            'callback_state': (
+                json.loads(self.cipher.decrypt(callback_state)) if callback_state else None
+            )
+        }
+
+    def put_callback_state(self, elicitation_id: str, state: Dict[str, Any]) -> None:
+        blob = self.cipher.encrypt(json.dumps(state))
+        with self.pool.connection() as conn:
+            conn.execute(
+                'UPDATE elicitations SET callback_state = ? WHERE elicitation_id = ?',
+                (blob, elicitation_id)
+            )
+
+    def delete_elicitation(self, elicitation_id: str) -> None:
+        with self.pool.connection() as conn:
+            conn.execute('DELETE FROM elicitations WHERE elicitation_id = ?', (elicitation_id,))
+
+
+STORE_BACKENDS: Dict[str, Callable[[], TokenStore]] = {
+    'sqlite': SQLiteTokenStore
+}
+
+_store: Optional[TokenStore] = None
+_store_lock = threading.Lock()
+
+
+def register_store_backend(name: str, factory: Callable[[], TokenStore]) -> None:
+    STORE_BACKENDS[name] = factory
+
+
+def get_store() -> TokenStore:
+    """
+    Returns the process-wide store for STORE_BACKEND, creating it on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if STORE_BACKENDS.get(STORE_BACKEND) is None:
+                    raise RuntimeError("store backend not found")
+                _store = STORE_BACKENDS[STORE_BACKEND]()
+
+    return _store
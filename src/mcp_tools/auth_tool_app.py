@@ -5,40 +5,146 @@ found in auth.providers.provider, to supply an OAuth token.
 OAuth tokens use the generic interface OAuthToken, found in auth.tokens.auth_token
 """
 
+import json
+import asyncio
+import inspect
+import weakref
 from abc import ABC
-from typing import Sequence, Dict, Any
+from functools import cache, partial
+from typing import Callable, Sequence, Dict, Any, Optional, Tuple
 from auth.providers.provider import OAuthProvider
-from auth.oauth_gate import ensure_auth
-from utils.errors import MethodNotFoundError, ScopesNotFoundError
+from auth.oauth_gate import authorize
+from auth.principal import resolve_principal
+from utils.concurrency import DEFAULT_TOOL_CONCURRENCY
+from utils.metrics import annotate, TOOL_COALESCED
+
+CoalesceKey = Tuple[str, str, str]
+
+
+@cache
+def _argument_defaults(function: Callable) -> Dict[str, Any]:
+    """
+    Defaults of a tool method's own arguments, so a call that spells out a default and one that
+    leaves it out coalesce.
+    """
+    return {
+        name: parameter.default
+        for name, parameter in inspect.signature(function).parameters.items()
+        if name not in ('self', 'token', 'ctx') and parameter.default is not parameter.empty
+    }
+
+
+def _json_default(value: Any) -> Any:
+    model_dump = getattr(value, 'model_dump', None)
+    return model_dump() if model_dump is not None else str(value)
+
 
 class OAuthToolApp(ABC):
     """
     Docstring for OAuthToolApp
+
+    Subclasses name the provider they authorize through, and the message shown when the user
+    must authorize. Every method decorated with @tool_scope_factory is exposed as an MCP tool
+    (see mcp_tools.tool_registry).
     """
+    provider_name: Optional[str] = None
+    auth_message: str = "Authorization is required."
+
     def __init__(self, provider: OAuthProvider):
         self.provider = provider
-    
-    def run_method(self, method_name: str, *, ctx: Dict[str, Any], **kwargs):
-        method = getattr(self, method_name, None)
-        scopes = getattr(method, '__scopes__', None)
-    
-        if method is None:
-            raise MethodNotFoundError
-        if scopes is None:
-            raise ScopesNotFoundError
-        
-        # pass to oauth gateway
-        result = ensure_auth(
-            provider=self.provider,
-            method=method,
-            ctx=ctx,
-            scopes=scopes,
-            **kwargs
+        # per (principal, tool) limits, dropped once no call holds or waits on them
+        self._limits: weakref.WeakValueDictionary[Tuple[str, str], asyncio.Semaphore] = (
+            weakref.WeakValueDictionary()
         )
+        # in-flight calls of @tool_coalesce_factory methods, shared by identical callers
+        self._in_flight: Dict[CoalesceKey, asyncio.Future] = {}
+
+    def _get_limit(self, principal_id: str, method_name: str, method) -> asyncio.Semaphore:
+        key = (principal_id, method_name)
+        limit = self._limits.get(key)
+        if limit is None:
+            size = getattr(method, '__concurrency__', DEFAULT_TOOL_CONCURRENCY)
+            limit = self._limits[key] = asyncio.Semaphore(size)
+
+        return limit
+
+    @classmethod
+    def tool_methods(cls) -> Dict[str, Callable]:
+        """
+        The class's @tool_scope_factory methods by name, in definition order. Subclass
+        definitions override inherited ones.
+        """
+        methods: Dict[str, Callable] = {}
+        for klass in reversed(cls.__mro__):
+            for name, attribute in vars(klass).items():
+                if callable(attribute) and getattr(attribute, '__scopes__', None) is not None:
+                    methods[name] = attribute
 
-        return result
-        
-        
+        return methods
 
+    async def call_tool(
+        self,
+        method_name: str,
+        method: Callable,
+        scopes: Sequence[str],
+        ctx: Dict[str, Any],
+        arguments: Dict[str, Any]
+    ):
+        """
+        Runs an already resolved (bound) tool method through the OAuth gate. Calls of
+        @tool_coalesce_factory methods join an identical call (same principal, method and
+        arguments) that is already in flight instead of starting their own.
+        """
+        principal_id = resolve_principal(ctx)
+        annotate(principal=principal_id)
+        if not getattr(method, '__coalesce__', False):
+            return await self._run(principal_id, method_name, method, scopes, ctx, arguments)
 
+        key = self._coalesce_key(principal_id, method_name, method, arguments)
+        call = self._in_flight.get(key)
+        if call is None:
+            # a task of its own, so the shared call outlives any one caller being cancelled
+            call = asyncio.ensure_future(
+                self._run(principal_id, method_name, method, scopes, ctx, arguments)
+            )
+            self._in_flight[key] = call
+            call.add_done_callback(partial(self._end_flight, key))
+        else:
+            TOOL_COALESCED.inc(method_name)
+
+        return await asyncio.shield(call)
+
+    async def _run(
+        self,
+        principal_id: str,
+        method_name: str,
+        method: Callable,
+        scopes: Sequence[str],
+        ctx: Dict[str, Any],
+        arguments: Dict[str, Any]
+    ):
+        # bounded per principal and tool so one user's slow calls never hold up another's
+        async with self._get_limit(principal_id, method_name, method):
+            token = await authorize(self.provider, principal_id, scopes)
+            return await method(token=token, ctx=ctx, **arguments)
+
+    @staticmethod
+    def _coalesce_key(
+        principal_id: str,
+        method_name: str,
+        method: Callable,
+        arguments: Dict[str, Any]
+    ) -> CoalesceKey:
+        normalized = {**_argument_defaults(getattr(method, '__func__', method)), **arguments}
+        return (
+            principal_id,
+            method_name,
+            json.dumps(normalized, sort_keys=True, default=_json_default)
+        )
 
+    def _end_flight(self, key: CoalesceKey, call: asyncio.Future) -> None:
+        if self._in_flight.get(key) is call:
+            del self._in_flight[key]
+        if not call.cancelled():
+            # mark the error retrieved, in case every caller was cancelled before it arrived
+            call.exception()
@@ -0,0 +1,78 @@
+"""
+Construction of tool results. A tool method returns a plain dict; for tools declared with
+@tool_output_factory, the registry encodes it here in the format the caller picked, as compact
+JSON text plus the same object as typed structuredContent.
+
+Formats:
+    json: lists of records stay lists of dicts
+    compact: lists of records become a table, one header row of column names plus one row of
+        values per record
+
+In both formats empty fields (None or '') are left out, and records only carry the columns
+some record has a value for.
+"""
+
+import json
+from typing import Any, Dict, List, Literal, get_args
+from pydantic import BaseModel, Field
+from mcp.types import CallToolResult, TextContent
+
+ResultFormat = Literal['json', 'compact']
+RESULT_FORMATS = get_args(ResultFormat)
+FORMAT_DESCRIPTION = (
+    "Result encoding: 'json' (lists of objects) or 'compact' (lists as a table of columns and "
+    "rows, fewer tokens for long lists)"
+)
+
+
+class Table(BaseModel):
+    """
+    Records in the compact format: column names, then one row of values per record. A cell is
+    null where the record has no value for the column.
+    """
+    columns: List[str] = Field(description="Column names, in the order of each row's values")
+    rows: List[List[Any]] = Field(description="One row per record")
+
+
+def _omit_empty(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _omit_empty(item) for key, item in value.items()
+            if item is not None and item != ''
+        }
+    if isinstance(value, list):
+        return [_omit_empty(item) for item in value]
+    return value
+
+
+def _is_records(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
+
+
+def to_table(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Table of records, with the columns in order of first appearance.
+    """
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    return {
+        'columns': columns,
+        'rows': [[record.get(column) for column in columns] for record in records]
+    }
+
+
+def encode_result(result: Dict[str, Any], result_format: ResultFormat = 'json') -> CallToolResult:
+    """
+    Encodes a tool method's result dict. The result isn't modified, as coalesced calls share it.
+    """
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"unknown result format: {result_format}")
+
+    content = _omit_empty(result)
+    if result_format == 'compact':
+        content = {
+            key: to_table(value) if _is_records(value) else value
+            for key, value in content.items()
+        }
+
+    text = json.dumps(content, separators=(',', ':'), ensure_ascii=False)
+    return CallToolResult(content=[TextContent(type='text', text=text)], structuredContent=content)
@@ -0,0 +1,139 @@
+"""
+Provides helpers for Google API batch requests. Sends up to BATCH_LIMIT sub-requests per HTTP
+round trip, reports per-item outcomes, and retries only the sub-requests that failed with a
+retryable error. A failed round trip (HTTP or transport error) fails its unanswered sub-requests
+instead of the whole batch, since earlier round trips may already have been applied.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+from googleapiclient.errors import HttpError
+from utils.concurrency import run_blocking
+from utils.retry import is_retryable, is_rate_limited, is_user_rate_limited, backoff_delay
+from utils.resilience import ApiGuard
+
+logger = logging.getLogger(__name__)
+
+BATCH_LIMIT = 50
+BATCH_RETRIES = 3
+
+Outcome = Tuple[Any, Optional[BaseException]]
+RequestBuilder = Callable[[Any], Any]
+
+
+def execute_batch(service, requests: Dict[int, RequestBuilder]) -> Dict[int, Outcome]:
+    """
+    Executes the requests (index -> builder taking the service) in batches of BATCH_LIMIT.
+    Blocking; run it on the worker pool.
+    """
+    # loaded with the client, not when the tools are registered
+    from httplib2 import HttpLib2Error
+    from google.auth.exceptions import TransportError
+
+    # errors of a whole batch round trip, as opposed to one of its sub-requests
+    round_trip_errors = (HttpError, HttpLib2Error, TransportError, OSError)
+    results: Dict[int, Outcome] = {}
+
+    def callback(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    items = list(requests.items())
+    for offset in range(0, len(items), BATCH_LIMIT):
+        chunk = items[offset:offset + BATCH_LIMIT]
+        batch = service.new_batch_http_request(callback=callback)
+        for index, build in chunk:
+            batch.add(build(service), request_id=str(index))
+
+        try:
+            batch.execute()
+        except round_trip_errors as e:
+            # the batch request itself failed, so every sub-request without an answer did too
+            for index, _ in chunk:
+                results.setdefault(index, (None, e))
+
+    return results
+
+
+def _round_error(outcome: Dict[int, Outcome]) -> Optional[BaseException]:
+    """
+    The error a batch round reports to its guard: any project-wide rate limit, else a retryable
+    error when every sub-request failed with one. None means the API answered.
+    """
+    errors = [error for _, error in outcome.values() if error is not None]
+    for error in errors:
+        if is_rate_limited(error) and not is_user_rate_limited(error):
+            return error
+    if errors and len(errors) == len(outcome) and all(is_retryable(e) for e in errors):
+        return errors[0]
+
+    return None
+
+
+async def _guarded_round(
+    guard: ApiGuard,
+    execute: Callable[[Dict[int, RequestBuilder]], Dict[int, Outcome]],
+    pending: Dict[int, RequestBuilder]
+) -> Dict[int, Outcome]:
+    await guard.acquire(len(pending))
+    try:
+        outcome = await run_blocking(execute, pending)
+    except BaseException as e:
+        guard.record(e)
+        raise
+
+    guard.record(_round_error(outcome))
+    return outcome
+
+
+def _is_conflict(error: Optional[BaseException]) -> bool:
+    return isinstance(error, HttpError) and error.resp.status == 409
+
+
+async def run_batch(
+    execute: Callable[[Dict[int, RequestBuilder]], Dict[int, Outcome]],
+    requests: Dict[int, RequestBuilder],
+    retries: int = BATCH_RETRIES,
+    guard: Optional[ApiGuard] = None,
+    on_conflict: Optional[Dict[int, RequestBuilder]] = None
+) -> Dict[int, Outcome]:
+    """
+    Runs execute (a blocking execute_batch wrapper) on the worker pool, re-sending only failed,
+    retryable sub-requests with backoff between rounds. With a guard, every round takes one rate
+    limiter token per sub-request and fails fast while the endpoint's circuit is open.
+
+    on_conflict maps indexes of idempotent creates (with client-chosen ids) to a request that
+    reads the created resource. A 409 means an earlier attempt whose answer was lost already
+    created it, so the read is sent instead and its answer reported.
+    """
+    on_conflict = on_conflict or {}
+    results: Dict[int, Outcome] = {}
+    pending = dict(requests)
+    attempt = 0
+    while pending:
+        if guard is None:
+            outcome = await run_blocking(execute, pending)
+        else:
+            outcome = await _guarded_round(guard, execute, pending)
+
+        failed = {}
+        retryable = []
+        for index, (response, error) in outcome.items():
+            results[index] = (response, error)
+            if error is None:
+                continue
+            read = on_conflict.get(index)
+            if read is not None and pending[index] is not read and _is_conflict(error):
+                failed[index] = read
+            elif attempt < retries and is_retryable(error):
+                failed[index] = pending[index]
+                retryable.append(error)
+
+        if retryable:
+            delay = max(backoff_delay(attempt, error, 1.0, 32.0) for error in retryable)
+            logger.warning("batch: retrying %d failed sub-requests in %.2fs", len(failed), delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+        pending = failed
+
+    return results
@@ -3,140 +3,940 @@ Provides a class for interfacing with the Google Calendar API. Come with a set o
 Makes use of the Google OAuth token, found in auth.tokens.google_token
 """
 
+import os
 import json
-from typing import Optional, List, Dict, Any
+import uuid
+import heapq
+import asyncio
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Sequence, Callable, Tuple, TypeVar
+from utils.env import load_env
 from googleapiclient.errors import HttpError
-from auth.tokens.google_token import GoogleToken
-from auth.providers.google_provider import GoogleProvider
-from utils.decorators import tool_retry_factory, tool_scope_factory
+from auth.oauth_gate import current_principal_id
+from utils.decorators import (
+    tool_retry_factory, tool_scope_factory, tool_concurrency_factory, tool_circuit_factory,
+    tool_coalesce_factory, tool_output_factory, TOOL_RETRY_DEADLINE
+)
+from utils.retry import retry_async
+from utils.resilience import get_api_guard
+from utils.errors import EventConflictError, CircuitOpenError
+from utils.concurrency import run_blocking
+from utils.metrics import stage
+from utils.cache import TTLCache, CacheEntry
 from mcp_tools.auth_tool_app import OAuthToolApp
-from gcsa.google_calendar import GoogleCalendar
-from gcsa.event import Event
+from mcp_tools.google.event_store import (
+    EVENT_RESOURCE_FIELDS, CalendarEventStore, EventRecord, EventStoreRegistry, encode_cursor,
+    decode_cursor
+)
+from mcp_tools.google.batch import execute_batch, run_batch
+from mcp_tools.google.watch import ChannelRegistry, WATCH_MAX_STALENESS
+from mcp_tools.google.intervals import merge_intervals, free_windows
+from mcp_tools.google.schemas import (
+    EventCreate, EventUpdate, EventResult, BatchResult, CalendarList, EventList, MultiEventList,
+    FreeSlots
+)
 from datetime import datetime, timedelta
 
+# the provider and token modules pull in google-auth's transports and oauthlib; they're only
+# needed once the app is built, not when its tools are registered
+if TYPE_CHECKING:
+    from auth.providers.google_provider import GoogleProvider
+    from auth.tokens.google_token import GoogleToken
+
+load_env()
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+READ_CONCURRENCY = 16
+WRITE_CONCURRENCY = 8
+CALENDAR_CACHE_TTL = float(os.getenv('CALENDAR_CACHE_TTL', 300))
+CALENDAR_CACHE_SIZE = int(os.getenv('CALENDAR_CACHE_SIZE', 1024))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 250
+# only the calendar fields list_calendars returns are pulled from the API
+CALENDAR_LIST_FIELDS = 'etag,nextPageToken,items(id,summary,description)'
+# calendars per freeBusy.query request
+FREEBUSY_MAX_CALENDARS = 50
+# calendars list_events_multi reads at once, per call
+MULTI_CALENDAR_CONCURRENCY = int(os.getenv('MULTI_CALENDAR_CONCURRENCY', 8))
+# shared with the write tools' @tool_circuit_factory, so batches, syncs and single writes trip
+# together. Reads take a guard only around their calls to Google, never for cached data
+EVENTS_GUARD = get_api_guard('google', 'events', (HttpError,))
+CALENDAR_LIST_GUARD = get_api_guard('google', 'calendarList', (HttpError,))
+
+T = TypeVar('T')
+# list_events_multi's merge order: start time, event id, then calendar id for shared events
+MultiKey = Tuple[float, str, str]
+
+EVENT_FIELDS = {
+    'name': lambda event: event.summary,
+    'start': lambda event: str(event.start),
+    'end': lambda event: str(event.end),
+    'description': lambda event: event.description,
+    'event_id': lambda event: event.event_id,
+    'etag': lambda event: event.etag,
+}
+# what list_events returns without a fields argument; etag is only needed to update safely
+DEFAULT_EVENT_FIELDS = ('name', 'start', 'end', 'description', 'event_id')
+
+
+def _event_body(
+    name: Optional[str],
+    start: datetime,
+    duration: timedelta,
+    location: Optional[str],
+    description: Optional[str],
+    partial: bool = False
+) -> Dict[str, Any]:
+    """
+    Events API body for an event. partial keeps only the fields being changed, for patches.
+    """
+    # gcsa is loaded on first use, not when the tools are registered
+    from gcsa.event import Event
+    from gcsa.serializers.event_serializer import EventSerializer
+
+    body = EventSerializer.to_json(Event(
+        summary=name,
+        start=start,
+        end=start + duration,
+        location=location,
+        description=description
+    ))
+    if not partial:
+        return body
+
+    patch = {'start': body['start'], 'end': body['end']}
+    for field, value in (('summary', name), ('location', location), ('description', description)):
+        if value is not None:
+            patch[field] = value
+    return patch
+
+
+def _event_record(event: EventRecord) -> Dict[str, Any]:
+    """
+    An event with all of EVENT_FIELDS, as returned by the write tools.
+    """
+    return {field: get(event) for field, get in EVENT_FIELDS.items()}
+
+
+def _encode_multi_cursor(key: MultiKey) -> str:
+    # Google event ids are base32hex, so the first '|' ends the event id
+    return encode_cursor((key[0], f'{key[1]}|{key[2]}'))
+
+
+def _decode_multi_cursor(cursor: str) -> MultiKey:
+    start, rest = decode_cursor(cursor)
+    event_id, separator, calendar_id = rest.partition('|')
+    if not separator:
+        raise ValueError("invalid page_token")
+    return start, event_id, calendar_id
+
+
+def _read_error(error: Exception) -> str:
+    if isinstance(error, HttpError):
+        return f"{error.resp.status} {error.reason}"
+    if isinstance(error, TimeoutError):
+        return "deadline exceeded"
+    return str(error)
+
+
+def _project_events(events, fields: Optional[Sequence[str]]):
+    """
+    Lazily converts events to dicts holding only the requested fields.
+    """
+    fields = list(fields) if fields else list(DEFAULT_EVENT_FIELDS)
+    unknown = [field for field in fields if field not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown event fields: {', '.join(unknown)}")
+
+    getters = [(field, EVENT_FIELDS[field]) for field in fields]
+    for event in events:
+        yield {field: get(event) for field, get in getters}
 
 
 class GoogleCalendarToolApp(OAuthToolApp):
-    def __init__(self, provider: GoogleProvider):
-        self.provider = provider
+    provider_name = 'google'
+    auth_message = "Authorization is required to access your Google Calendar."
+
+    def __init__(self, provider: 'GoogleProvider'):
+        # deferred like the provider: the pool pulls in googleapiclient discovery and httplib2
+        from mcp_tools.google.client_pool import CalendarClientPool
+
+        super().__init__(provider=provider)
+        self.clients = CalendarClientPool()
+        self.event_stores = EventStoreRegistry()
+        self.calendar_cache = TTLCache(ttl=CALENDAR_CACHE_TTL, max_size=CALENDAR_CACHE_SIZE)
+        # push notification channels; while one is open its data is only refetched on change
+        self.channels = ChannelRegistry(self._service_for)
+
+    def invalidate_calendars(self, principal_id: Optional[str] = None) -> None:
+        """
+        Drops cached calendar lists, for one principal or all of them. Call after anything
+        that changes a user's calendar list.
+        """
+        if principal_id is None:
+            self.calendar_cache.clear()
+        else:
+            self.calendar_cache.invalidate(principal_id)
+
+    def _client(self, token: 'GoogleToken'):
+        return self.clients.client(current_principal_id.get(), token.present_creds())
+
+    @contextmanager
+    def _service_for(self, principal_id: Optional[str]):
+        """
+        An API service for a principal outside of a tool call, for channel renewals.
+        """
+        token = self.provider.get_access_token(principal_id, SCOPES)
+        if token is None:
+            raise RuntimeError(f"no Google token for {principal_id}")
+        with self.clients.client(principal_id, token.present_creds()) as gc:
+            yield gc.service
+
+    def _events_changed(self, principal_id: Optional[str], calendar_id: str) -> None:
+        store = self.event_stores.peek(principal_id, calendar_id)
+        if store is not None:
+            store.invalidate()
+
+    def _write_through(self, calendar_id: str, event: EventRecord) -> None:
+        """
+        Applies a successful write to the calendar's event store, if one is being kept.
+        """
+        store = self.event_stores.peek(current_principal_id.get(), calendar_id)
+        if store is not None:
+            with store.lock:
+                store.upsert(event)
     
     @tool_scope_factory(scopes=SCOPES)
-    @tool_retry_factory(error_message="Google Calendar error (create_event)", retry_on=(HttpError,))
-    def create_event(
+    @tool_output_factory(model=EventResult)
+    @tool_concurrency_factory(limit=WRITE_CONCURRENCY)
+    async def create_event(
         self, *,
-        token: GoogleToken,
-        ctx: Dict[str, Any], 
-        calendar_id: str,
-        name: str, 
-        start: datetime, 
-        duration: Optional[timedelta],
-        location: Optional[str],
-        description: Optional[str]
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
+        start: str,
+        name: Optional[str] = None,
+        calendar_id: str = 'primary',
+        duration_minutes: int = 30,
+        location: Optional[str] = None,
+        description: Optional[str] = None,
+        event_id: Optional[str] = None
     ):
         """
-        Docstring for create_event
+        Create a new event in a specific calendar.
+
+        Prerequisites:
+            - calendar_id: Obtain from list_calendars first. Otherwise defaults to primary calendar.
+
+        Args:
+            calendar_id: The calendar ID from list_calendars
+            start: Start time in ISO format (e.g., '2026-01-06T14:00:00')
+            name: Event name/title (optional - agent should generate from context if not provided)
+            duration_minutes: Event duration in minutes (default: 30)
+            location: Optional event location
+            description: Optional event description
+            event_id: Optional ID for the new event (5-1024 characters, a-v and 0-9). Only set it
+                to repeat a create_event call that failed with this ID in its error; the event is
+                then never created twice.
         """
-        creds = token.present_creds()
-        gc = GoogleCalendar(credentials=creds, default_calendar=calendar_id)
-        event = Event(
-            summary=name,
-            start=start,
-            end=start + duration,
-            location=location,
-            description=description
+        body = _event_body(
+            name,
+            datetime.fromisoformat(start),
+            timedelta(minutes=duration_minutes),
+            location,
+            description
         )
-        event = gc.add_event(event=event)
+        # chosen once per call, so an attempt that timed out but still lands, and the attempts
+        # after it, all insert the same event; base32hex, as Google requires of event ids
+        body['id'] = event_id or uuid.uuid4().hex
+
+        def insert_event():
+            with self._client(token) as gc:
+                events = gc.service.events()
+                try:
+                    response = events.insert(calendarId=calendar_id, body=body).execute()
+                except HttpError as e:
+                    if e.resp.status != 409:
+                        raise
+                    # an earlier attempt already created it
+                    response = events.get(calendarId=calendar_id, eventId=body['id']).execute()
+                    if response.get('status') == 'cancelled':
+                        raise
+
+            event = EventRecord.from_json(response)
+            self._write_through(calendar_id, event)
+            return event
+
+        try:
+            with stage('api_call'):
+                event = await retry_async(
+                    lambda: EVENTS_GUARD.call(lambda: run_blocking(insert_event)),
+                    name='create_event',
+                    retry_on=(HttpError,),
+                    retries=3,
+                    deadline=TOOL_RETRY_DEADLINE
+                )
+        except TimeoutError as e:
+            raise RuntimeError(
+                "Google Calendar error (create_event): deadline exceeded. The event may still be "
+                f"created; retry with event_id='{body['id']}' so it isn't created twice"
+            ) from e
+        except HttpError as e:
+            raise RuntimeError("Google Calendar error (create_event)") from e
+
+        with stage('serialization'):
+            return {
+                "event_details": _event_record(event),
+                "id": event.id
+            }
+
+
+    async def _run_event_batch(
+        self,
+        token: 'GoogleToken',
+        calendar_ids: Dict[int, str],
+        requests: Dict[int, Any],
+        on_conflict: Optional[Dict[int, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Runs event mutations as Google batch requests and reports each item's outcome in input
+        order. Successful results are written through to the event stores. on_conflict is as in
+        run_batch.
+        """
+        def execute(pending):
+            with self._client(token) as gc:
+                outcome = execute_batch(gc.service, pending)
+            for index, (response, error) in outcome.items():
+                if error is None:
+                    event = EventRecord.from_json(response)
+                    self._write_through(calendar_ids[index], event)
+                    outcome[index] = (event, None)
+            return outcome
+
+        with stage('api_call'):
+            outcome = await run_batch(
+                execute, requests, guard=EVENTS_GUARD, on_conflict=on_conflict
+            )
+
+        results = []
+        with stage('serialization'):
+            for index in sorted(outcome):
+                event, error = outcome[index]
+                if error is None:
+                    results.append({
+                        'index': index,
+                        'status': 'ok',
+                        'id': event.id,
+                        'event_details': _event_record(event)
+                    })
+                else:
+                    results.append({'index': index, 'status': 'error', 'error': str(error)})
 
+        failed = sum(1 for result in results if result['status'] == 'error')
         return {
-            "event_details": str(event),
-            "id": event.id
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'results': results
         }
 
 
     @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=BatchResult)
+    @tool_concurrency_factory(limit=WRITE_CONCURRENCY)
+    async def batch_create_events(
+        self, *,
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
+        events: List[EventCreate]
+    ):
+        """
+        Create many events at once. Prefer this over repeated create_event calls.
+
+        Prerequisites:
+            - calendar_id: Obtain from list_calendars first. Otherwise defaults to primary calendar.
+
+        Args:
+            events: Events to create, each with create_event's fields
+
+        Returns a per-event status ('ok' with id, or 'error'), in the order given.
+        """
+        # sent as Google batch requests, up to 50 per round trip. Each event gets its id up front,
+        # so re-sending an insert whose answer was lost can't create it twice
+        calendar_ids = {}
+        requests = {}
+        reads = {}
+        for index, item in enumerate(events):
+            calendar_ids[index] = item.calendar_id
+            body = _event_body(
+                item.name,
+                datetime.fromisoformat(item.start),
+                timedelta(minutes=item.duration_minutes),
+                item.location,
+                item.description
+            )
+            # base32hex, as Google requires of event ids
+            body['id'] = uuid.uuid4().hex
+            requests[index] = lambda service, c=item.calendar_id, b=body: (
+                service.events().insert(calendarId=c, body=b)
+            )
+            reads[index] = lambda service, c=item.calendar_id, e=body['id']: (
+                service.events().get(calendarId=c, eventId=e)
+            )
+
+        return await self._run_event_batch(token, calendar_ids, requests, on_conflict=reads)
+
+
+    @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=BatchResult)
+    @tool_concurrency_factory(limit=WRITE_CONCURRENCY)
+    async def batch_update_events(
+        self, *,
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
+        events: List[EventUpdate]
+    ):
+        """
+        Update many existing events at once. Prefer this over repeated update_event calls.
+
+        Prerequisites:
+            - calendar_id: Obtain from list_calendars first
+            - event_id: Obtain from list_events first
+
+        Args:
+            events: Event changes, each with update_event's fields. Unset name, location and
+                description keep their current values.
+
+        Returns a per-event status ('ok' with id, or 'error'), in the order given.
+        """
+        # sent as Google batch requests (up to 50 per round trip), each a patch of the fields set
+        calendar_ids = {}
+        requests = {}
+        for index, item in enumerate(events):
+            calendar_ids[index] = item.calendar_id
+            body = _event_body(
+                item.name,
+                datetime.fromisoformat(item.start),
+                timedelta(minutes=item.duration_minutes),
+                item.location,
+                item.description,
+                partial=True
+            )
+            requests[index] = lambda service, c=item.calendar_id, e=item.event_id, b=body: (
+                service.events().patch(calendarId=c, eventId=e, body=b)
+            )
+
+        return await self._run_event_batch(token, calendar_ids, requests)
+
+
+    @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=EventResult)
+    @tool_concurrency_factory(limit=WRITE_CONCURRENCY)
     @tool_retry_factory(error_message="Google Calendar error (update_event)", retry_on=(HttpError,))
-    def update_event(
+    @tool_circuit_factory(provider='google', endpoint='events', failure_on=(HttpError,))
+    async def update_event(
         self, *,
-        token: GoogleToken,
-        ctx: Dict[str, Any], 
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
         calendar_id: str,
         event_id: str,
-        name: str, 
-        start: datetime, 
-        duration: Optional[timedelta],
-        location: Optional[str],
-        description: Optional[str]
+        start: str,
+        name: Optional[str] = None,
+        duration_minutes: int = 30,
+        location: Optional[str] = None,
+        description: Optional[str] = None,
+        etag: Optional[str] = None
     ):
-        creds = token.present_creds()
-        gc = GoogleCalendar(credentials=creds, default_calendar=calendar_id)
-        event = gc.get_event(event_id=event_id, calendar_id=calendar_id)
-
-        # Preserve existing name if not provided
-        if name is not None:
-            event.summary = name
-        event.start = start
-        event.end = start + duration
-        event.location = location
-        event.description = description
-        event = gc.update_event(event=event)
+        """
+        Update an existing event in a specific calendar.
 
-        return {
-            "event_details": str(event),
-            "id": event.id
-        }
+        Prerequisites:
+            - calendar_id: Obtain from list_calendars first
+            - event_id: Obtain from list_events first
 
+        Args:
+            calendar_id: The calendar ID from list_calendars
+            event_id: The event ID from list_events
+            start: Updated start time in ISO format (e.g., '2026-01-06T14:00:00')
+            name: Updated event name/title (optional - keeps existing if not provided)
+            duration_minutes: Updated event duration in minutes (default: 30)
+            location: Updated event location (optional - keeps existing if not provided)
+            description: Updated event description (optional - keeps existing if not provided)
+            etag: The event's etag from list_events (fields including 'etag') or a previous
+                update. When given, the update fails if the event has changed since.
+        """
+        body = _event_body(
+            name,
+            datetime.fromisoformat(start),
+            timedelta(minutes=duration_minutes),
+            location,
+            description,
+            partial=True
+        )
 
-    @tool_scope_factory(scopes=SCOPES)
-    @tool_retry_factory(error_message="Google Calendar error (list_calendars)", retry_on=(HttpError,))
-    def list_calendars(self, *, token: GoogleToken, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+        def patch_event():
+            # one events.patch of the fields being set, instead of a get and a full update
+            with self._client(token) as gc:
+                request = gc.service.events().patch(
+                    calendarId=calendar_id,
+                    eventId=event_id,
+                    body=body,
+                    fields=EVENT_RESOURCE_FIELDS
+                )
+                if etag is not None:
+                    request.headers['If-Match'] = etag
+                try:
+                    response = request.execute()
+                except HttpError as e:
+                    if e.resp.status == 412:
+                        raise EventConflictError(event_id) from e
+                    raise
+
+            event = EventRecord.from_json(response)
+            self._write_through(calendar_id, event)
+            return event
+
+        with stage('api_call'):
+            event = await run_blocking(patch_event)
+
+        with stage('serialization'):
+            return {
+                "event_details": _event_record(event),
+                "id": event.id
+            }
+
+
+    def _fetch_calendar_list(
+        self,
+        service,
+        principal_id: Optional[str],
+        stale: Optional[CacheEntry]
+    ) -> List[Dict[str, Any]]:
         """
-        Lists calendars on the user's calendar list.
+        Fetches the calendar list, revalidating an expired cache entry with If-None-Match when it
+        has an ETag. A 304 keeps the cached list and restarts its TTL.
         """
-        creds = token.present_creds()
-        gc = GoogleCalendar(credentials=creds)
+        request = service.calendarList().list(fields=CALENDAR_LIST_FIELDS)
+        if stale is not None and stale.etag is not None:
+            request.headers['If-None-Match'] = stale.etag
+
+        try:
+            response = request.execute()
+        except HttpError as e:
+            if e.resp.status == 304 and stale is not None:
+                self.calendar_cache.touch(principal_id)
+                return stale.value
+            raise
+
+        # the collection ETag only covers a single page, so multi-page lists are never revalidated
+        etag = response.get('etag')
+        items = response.get('items', [])
+        page_token = response.get('nextPageToken')
+        while page_token:
+            etag = None
+            response = service.calendarList().list(
+                pageToken=page_token,
+                fields=CALENDAR_LIST_FIELDS
+            ).execute()
+            items.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
 
         calendar_list = []
-        for calendar in gc.get_calendar_list():
+        for calendar in items:
             calendar_dict = {}
-            calendar_dict['name'] = calendar.summary
-            calendar_dict['description'] = calendar.description or 'n/a'
-            calendar_dict['calendar_id'] = calendar.calendar_id
+            calendar_dict['name'] = calendar.get('summary')
+            calendar_dict['description'] = calendar.get('description')
+            calendar_dict['calendar_id'] = calendar['id']
             calendar_list.append(calendar_dict)
-        
+
+        self.calendar_cache.put(principal_id, calendar_list, etag=etag)
+        return calendar_list
+
+
+    async def _calendar_list(
+        self,
+        token: 'GoogleToken',
+        principal_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        The principal's calendars, from the cache while it's fresh. A watched list is dropped as
+        soon as a notification says it changed; its TTL still bounds how stale it can get, as
+        notifications may reach another server process. Only a fetch goes through the
+        calendarList guard, so cached lists are served without rate limiter tokens and while the
+        circuit is open.
+        """
+        self.channels.watching(principal_id, None)
+        calendar_list = self.calendar_cache.get(principal_id)
+        if calendar_list is not None:
+            return calendar_list
+
+        def get_calendar_list():
+            stale = self.calendar_cache.get_stale(principal_id)
+            with self._client(token) as gc:
+                # watched before fetching, so no change goes unnotified
+                self.channels.watch(
+                    gc.service,
+                    principal_id,
+                    None,
+                    lambda: self.invalidate_calendars(principal_id)
+                )
+                return self._fetch_calendar_list(gc.service, principal_id, stale)
+
+        with stage('api_call'):
+            calendar_list = await CALENDAR_LIST_GUARD.call(lambda: run_blocking(get_calendar_list))
+        return calendar_list
+
+
+    @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=CalendarList)
+    @tool_concurrency_factory(limit=READ_CONCURRENCY)
+    @tool_coalesce_factory()
+    @tool_retry_factory(error_message="Google Calendar error (list_calendars)", retry_on=(HttpError,))
+    async def list_calendars(self, *, token: 'GoogleToken', ctx: Dict[str, Any]):
+        """
+        List all calendars in the user's Google Calendar account.
+        Returns calendar_id values needed for other calendar tools.
+        """
+        calendar_list = await self._calendar_list(token, current_principal_id.get())
         return {
             'calendars': calendar_list
         }
 
 
+    def _needs_sync(
+        self,
+        principal_id: Optional[str],
+        calendar_id: str,
+        store: CalendarEventStore
+    ) -> bool:
+        """
+        Whether a read must sync the store first. A watched calendar is only synced after a
+        change notification, or once its last sync is WATCH_MAX_STALENESS seconds old.
+        """
+        return (
+            not self.channels.watching(principal_id, calendar_id)
+            or store.changed
+            or store.sync_age > WATCH_MAX_STALENESS
+        )
+
+    def _sync_events(
+        self,
+        token: 'GoogleToken',
+        principal_id: Optional[str],
+        calendar_id: str,
+        store: CalendarEventStore
+    ) -> None:
+        with store.lock:
+            # another call may have synced it while this one waited for the lock
+            if not self._needs_sync(principal_id, calendar_id, store):
+                return
+            with self._client(token) as gc:
+                # watched before syncing, so no change goes unnotified
+                self.channels.watch(
+                    gc.service,
+                    principal_id,
+                    calendar_id,
+                    lambda: self._events_changed(principal_id, calendar_id)
+                )
+                store.sync(gc.service)
+
+    def _read_store(self, store: CalendarEventStore, read: Callable[[CalendarEventStore], T]) -> T:
+        with store.lock:
+            return read(store)
+
+    async def _read_events(
+        self,
+        token: 'GoogleToken',
+        principal_id: Optional[str],
+        calendar_id: str,
+        read: Callable[[CalendarEventStore], T]
+    ) -> T:
+        """
+        Runs read on the calendar's event store, under its lock, syncing it first when needed.
+        Only the sync goes through the events guard, so reads served from the store take no
+        rate limiter tokens and keep working while the circuit is open.
+        """
+        store = self.event_stores.get(principal_id, calendar_id)
+        if self._needs_sync(principal_id, calendar_id, store):
+            await EVENTS_GUARD.call(lambda: run_blocking(
+                self._sync_events, token, principal_id, calendar_id, store
+            ))
+        return await run_blocking(self._read_store, store, read)
+
+
     @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=EventList)
+    @tool_concurrency_factory(limit=READ_CONCURRENCY)
+    @tool_coalesce_factory()
     @tool_retry_factory(error_message="Google Calendar error (list_events)", retry_on=(HttpError,))
-    def list_events(
-        self, *, 
-        token: GoogleToken, 
-        ctx: Dict[str, Any], 
-        calendar_id: str, 
-        start_time: datetime,
-        duration: timedelta
+    async def list_events(
+        self, *,
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
+        start_time: str,
+        calendar_id: str = 'primary',
+        duration_days: int = 7,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ):
-        creds = token.present_creds()
-        gc = GoogleCalendar(credentials=creds, default_calendar=calendar_id)
-        events = list(gc.get_events(
-            start_time, start_time+duration, single_events=True, order_by='startTime')
-        )
-        
-        events_list = []
-        for event in events:
-            event_dict = {}
-            event_dict['name'] = event.summary
-            event_dict['start'] = str(event.start)
-            event_dict['end'] = str(event.end)
-            event_dict['description'] = event.description or 'n/a'
-            event_dict['event_id'] = event.event_id or 'n/a'
-            events_list.append(event_dict)
+        """
+        List events from a specific calendar within a time range, one page at a time.
+
+        Prerequisites:
+            - calendar_id: Obtain from list_calendars first. Otherwise defaults to primary
+            calendar
+
+        Args:
+            calendar_id: The calendar ID from list_calendars
+            start_time: Start time in ISO format (e.g., '2026-01-06T00:00:00')
+            duration_days: Number of days to look ahead (default: 7)
+            page_size: Maximum events to return (default: 50, max: 250)
+            page_token: next_page_token from a previous call, to fetch the following page
+            fields: Event fields to include, any of name, start, end, description, event_id,
+                etag (default: all but etag)
+
+        Returns event_id values needed for update_event, and next_page_token when more events
+        remain.
+        """
+        start_time = datetime.fromisoformat(start_time)
+        duration = timedelta(days=duration_days)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        after = decode_cursor(page_token) if page_token else None
+
+        def get_page(store: CalendarEventStore):
+            window = store.iter_range(start_time, start_time+duration, after=after)
+            return list(islice(window, page_size + 1))
+
+        with stage('api_call'):
+            page = await self._read_events(
+                token, current_principal_id.get(), calendar_id, get_page
+            )
+
+        next_page_token = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            next_page_token = encode_cursor(page[-1][0])
+
+        with stage('serialization'):
+            events_list = list(_project_events((event for _, event in page), fields))
         
         return {
-            'events': events_list
+            'events': events_list,
+            'next_page_token': next_page_token
+        }
+
+
+    async def _read_calendar_page(
+        self,
+        token: 'GoogleToken',
+        principal_id: Optional[str],
+        calendar_id: str,
+        time_min: datetime,
+        time_max: datetime,
+        after: Optional[MultiKey],
+        limit: int
+    ) -> List[Tuple[MultiKey, EventRecord]]:
+        """
+        The calendar's first limit events after the cursor, in merge order, each calendar
+        retried and rate limited on its own.
+        """
+        def get_page(store: CalendarEventStore):
+            # resumes at the cursor's start time (a 1-tuple sorts before every key with it), and
+            # drops the events tied with the cursor that were already returned
+            resume = (after[0],) if after is not None else None
+            window = (
+                ((start, event_id, calendar_id), event)
+                for (start, event_id), event in store.iter_range(time_min, time_max, after=resume)
+            )
+            if after is not None:
+                window = (item for item in window if item[0] > after)
+            return list(islice(window, limit))
+
+        return await retry_async(
+            lambda: self._read_events(token, principal_id, calendar_id, get_page),
+            name='list_events_multi',
+            retry_on=(HttpError,),
+            retries=3,
+            deadline=TOOL_RETRY_DEADLINE
+        )
+
+
+    @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=MultiEventList)
+    @tool_concurrency_factory(limit=READ_CONCURRENCY)
+    @tool_coalesce_factory()
+    @tool_retry_factory(error_message="Google Calendar error (list_events_multi)", retry_on=(HttpError,))
+    async def list_events_multi(
+        self, *,
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
+        start_time: str,
+        calendar_ids: Optional[List[str]] = None,
+        duration_days: int = 7,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ):
+        """
+        List events from several calendars within a time range as one list ordered by start
+        time, one page at a time. Prefer this over one list_events call per calendar.
+
+        Prerequisites:
+            - calendar_ids: Obtain from list_calendars first, or leave unset for all calendars
+
+        Args:
+            start_time: Start time in ISO format (e.g., '2026-01-06T00:00:00')
+            calendar_ids: Calendar IDs from list_calendars, or ['all'] (default: all calendars)
+            duration_days: Number of days to look ahead (default: 7)
+            page_size: Maximum events to return (default: 50, max: 250)
+            page_token: next_page_token from a previous call with the same calendars
+            fields: Event fields to include, any of name, start, end, description, event_id,
+                etag (default: all but etag); calendar_id is always included
+
+        Returns each event's calendar_id and event_id, next_page_token when more events remain,
+        plus any calendars that could not be read.
+        """
+        start_time = datetime.fromisoformat(start_time)
+        time_max = start_time + timedelta(days=duration_days)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        after = _decode_multi_cursor(page_token) if page_token else None
+        principal_id = current_principal_id.get()
+
+        if not calendar_ids or 'all' in calendar_ids:
+            calendar_list = await self._calendar_list(token, principal_id)
+            calendar_ids = [calendar['calendar_id'] for calendar in calendar_list]
+        calendar_ids = list(dict.fromkeys(calendar_ids))
+
+        # calendars are read concurrently, so the call takes about as long as the slowest one
+        limit = asyncio.Semaphore(MULTI_CALENDAR_CONCURRENCY)
+        errors = {}
+
+        async def read_calendar(calendar_id: str):
+            async with limit:
+                try:
+                    return await self._read_calendar_page(
+                        token, principal_id, calendar_id, start_time, time_max, after,
+                        page_size + 1
+                    )
+                except (HttpError, CircuitOpenError, TimeoutError) as e:
+                    errors[calendar_id] = _read_error(e)
+                    return []
+
+        with stage('api_call'):
+            pages = await asyncio.gather(*(read_calendar(c) for c in calendar_ids))
+
+        # each calendar's page is already in merge order, so a k-way heap merge orders them all
+        page = list(islice(heapq.merge(*pages, key=itemgetter(0)), page_size + 1))
+        next_page_token = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            next_page_token = _encode_multi_cursor(page[-1][0])
+
+        with stage('serialization'):
+            events_list = [
+                {**record, 'calendar_id': key[2]}
+                for (key, _), record in zip(page, _project_events((e for _, e in page), fields))
+            ]
+
+        return {
+            'events': events_list,
+            'next_page_token': next_page_token,
+            'errors': {calendar_id: errors[calendar_id] for calendar_id in calendar_ids
+                       if calendar_id in errors}
+        }
+
+
+    @tool_scope_factory(scopes=SCOPES)
+    @tool_output_factory(model=FreeSlots)
+    @tool_concurrency_factory(limit=READ_CONCURRENCY)
+    @tool_coalesce_factory()
+    @tool_retry_factory(error_message="Google Calendar error (find_free_slots)", retry_on=(HttpError,))
+    @tool_circuit_factory(provider='google', endpoint='freebusy', failure_on=(HttpError,))
+    async def find_free_slots(
+        self, *,
+        token: 'GoogleToken',
+        ctx: Dict[str, Any],
+        start_time: str,
+        calendar_ids: Optional[List[str]] = None,
+        duration_days: int = 7,
+        min_duration_minutes: int = 30
+    ):
+        """
+        Find time windows when all the given calendars are free. Prefer this over list_events
+        when looking for an open slot.
+
+        Prerequisites:
+            - calendar_ids: Obtain from list_calendars first. Otherwise defaults to primary
+            calendar
+
+        Args:
+            start_time: Start of the search range in ISO format (e.g., '2026-01-06T09:00:00')
+            calendar_ids: Calendar IDs from list_calendars that must all be free
+            duration_days: Number of days to search (default: 7)
+            min_duration_minutes: Shortest window to return, in minutes (default: 30)
+
+        Returns free windows as start/end pairs, plus any calendars that could not be read.
+        """
+        start_time = datetime.fromisoformat(start_time)
+        if start_time.tzinfo is None:
+            start_time = start_time.astimezone()
+        end_time = start_time + timedelta(days=duration_days)
+        # order kept so chunks (and reported errors) follow the caller's list
+        calendar_ids = list(dict.fromkeys(calendar_ids or ['primary']))
+
+        def query_free_busy():
+            calendars = {}
+            with self._client(token) as gc:
+                for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+                    chunk = calendar_ids[i:i + FREEBUSY_MAX_CALENDARS]
+                    response = gc.service.freebusy().query(body={
+                        'timeMin': start_time.isoformat(),
+                        'timeMax': end_time.isoformat(),
+                        'items': [{'id': calendar_id} for calendar_id in chunk]
+                    }).execute()
+                    calendars.update(response.get('calendars', {}))
+            return calendars
+
+        with stage('api_call'):
+            calendars = await run_blocking(query_free_busy)
+
+        busy = []
+        errors = {}
+        for calendar_id in calendar_ids:
+            calendar = calendars.get(calendar_id)
+            if calendar is None:
+                # a calendar Google left out of the answer is unknown, not free
+                errors[calendar_id] = 'missingFromResponse'
+                continue
+            if calendar.get('errors'):
+                errors[calendar_id] = calendar['errors'][0].get('reason', 'unknown')
+                continue
+            for period in calendar.get('busy', []):
+                busy.append((
+                    datetime.fromisoformat(period['start']).timestamp(),
+                    datetime.fromisoformat(period['end']).timestamp()
+                ))
+
+        windows = free_windows(
+            merge_intervals(busy),
+            start_time.timestamp(),
+            end_time.timestamp(),
+            min_length=min_duration_minutes * 60
+        )
+        tz = start_time.tzinfo
+
+        with stage('serialization'):
+            free_slots = [
+                {
+                    'start': datetime.fromtimestamp(start, tz).isoformat(),
+                    'end': datetime.fromtimestamp(end, tz).isoformat()
+                }
+                for start, end in windows
+            ]
+
+        return {
+            'free_slots': free_slots,
+            'errors': errors
         }
 
 
@@ -0,0 +1,120 @@
+"""
+Provides a pool of GoogleCalendar clients, keyed by principal and credentials identity. Reuses
+built service objects and their keep-alive HTTP connections across tool calls, and drops them
+when a principal's credentials rotate.
+"""
+
+import os
+import json
+from functools import cache
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Iterator
+import httplib2
+from utils.env import load_env
+from gcsa.google_calendar import GoogleCalendar
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery, discovery_cache
+from utils.locks import ShardedMutex
+from utils.metrics import stage
+
+load_env()
+GOOGLE_HTTP_TIMEOUT = float(os.getenv('GOOGLE_HTTP_TIMEOUT', 30))
+CLIENT_POOL_MAX_IDLE = int(os.getenv('CLIENT_POOL_MAX_IDLE', 8))
+# points the Calendar API (batch requests included) at another host, e.g. a local stand-in
+GOOGLE_API_ROOT_URL = os.getenv('GOOGLE_API_ROOT_URL')
+
+
+@cache
+def _discovery_document() -> str:
+    """
+    The Calendar v3 discovery document, read once per process instead of once per client.
+    """
+    document = discovery_cache.get_static_doc('calendar', 'v3')
+    if GOOGLE_API_ROOT_URL:
+        root_url = GOOGLE_API_ROOT_URL.rstrip('/') + '/'
+        service = json.loads(document)
+        service['rootUrl'] = root_url
+        service['baseUrl'] = root_url + service['servicePath']
+        document = json.dumps(service)
+
+    return document
+
+
+class PooledGoogleCalendar(GoogleCalendar):
+    """
+    GoogleCalendar built from the cached discovery document on its own HTTP transport.
+
+    Skips gcsa's constructor, which re-runs discovery and refreshes credentials; the provider
+    already hands out fresh credentials.
+    """
+    def __init__(self, credentials: Credentials):
+        self.default_calendar = 'primary'
+        self.credentials = credentials
+        self.service = discovery.build_from_document(
+            _discovery_document(),
+            http=AuthorizedHttp(credentials, http=httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT))
+        )
+
+    def close(self) -> None:
+        self.service.close()
+
+
+class _ClientBucket:
+    __slots__ = ('creds', 'idle')
+
+    def __init__(self, creds: Credentials):
+        self.creds = creds
+        self.idle: List[PooledGoogleCalendar] = []
+
+
+class CalendarClientPool:
+    """
+    Hands out one client per concurrent call; httplib2 transports are not thread-safe, so a
+    client is never shared between worker threads while checked out.
+    """
+    def __init__(self, max_idle: int = CLIENT_POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        # buckets are guarded by their principal's shard, so principals don't contend
+        self._locks = ShardedMutex()
+        self._buckets: Dict[str, _ClientBucket] = {}
+
+    @contextmanager
+    def client(self, principal_id: str, creds: Credentials) -> Iterator[PooledGoogleCalendar]:
+        stale: Optional[_ClientBucket] = None
+        lock = self._locks.get(principal_id)
+        with lock:
+            bucket = self._buckets.get(principal_id)
+            if bucket is None or bucket.creds is not creds:
+                stale = bucket
+                bucket = self._buckets[principal_id] = _ClientBucket(creds)
+            gc = bucket.idle.pop() if bucket.idle else None
+
+        if stale is not None:
+            self._close(stale)
+        if gc is None:
+            with stage('client_build'):
+                gc = PooledGoogleCalendar(creds)
+
+        try:
+            yield gc
+        finally:
+            with lock:
+                keep = self._buckets.get(principal_id) is bucket and len(bucket.idle) < self.max_idle
+                if keep:
+                    bucket.idle.append(gc)
+            if not keep:
+                gc.close()
+
+    def invalidate(self, principal_id: Optional[str] = None) -> None:
+        principal_ids = list(self._buckets) if principal_id is None else [principal_id]
+        for key in principal_ids:
+            with self._locks.get(key):
+                bucket = self._buckets.pop(key, None)
+            if bucket is not None:
+                self._close(bucket)
+
+    @staticmethod
+    def _close(bucket: _ClientBucket) -> None:
+        while bucket.idle:
+            bucket.idle.pop().close()
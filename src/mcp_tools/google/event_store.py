@@ -0,0 +1,320 @@
+"""
+Provides a local, per-calendar event store kept current with Google Calendar's syncToken
+incremental sync. list_events is answered from a start-time index over the store, so repeated
+reads cost one delta request instead of a full listing.
+
+Synced events are decoded straight from the API JSON into EventRecords rather than gcsa Events,
+whose attendee, reminder and dateutil parsing is wasted on the few fields tools return.
+"""
+
+import os
+import heapq
+import base64
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from time import monotonic
+from datetime import datetime, date, time
+from typing import Any, Dict, List, Optional, Tuple, Union, Iterator
+from googleapiclient.errors import HttpError
+from utils.locks import ShardedMutex
+from utils.cache import TTLCache
+from utils.env import load_env
+
+load_env()
+SYNC_PAGE_SIZE = 2500
+# stores kept across all principals, and how long an unread store is kept
+EVENT_STORE_MAX = int(os.getenv('EVENT_STORE_MAX', 1024))
+EVENT_STORE_IDLE_SECONDS = float(os.getenv('EVENT_STORE_IDLE_SECONDS', 3600))
+# only the event fields tools can return are pulled from the API
+EVENT_RESOURCE_FIELDS = 'id,etag,status,summary,description,location,start,end'
+SYNC_FIELDS = f'nextPageToken,nextSyncToken,items({EVENT_RESOURCE_FIELDS})'
+
+IndexKey = Tuple[float, str]
+
+
+def encode_cursor(key: IndexKey) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]!r}|{key[1]}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> IndexKey:
+    try:
+        start, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return float(start), event_id
+    except ValueError as e:
+        raise ValueError("invalid page_token") from e
+
+
+def _timestamp(value: Union[datetime, date]) -> float:
+    """
+    Epoch seconds for an event boundary. Naive datetimes and all-day dates are read in local
+    time, matching how gcsa localizes query bounds.
+    """
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    return value.astimezone().timestamp()
+
+
+def _boundary(value: Optional[Dict[str, str]]) -> Union[datetime, date, None]:
+    """
+    An event's start or end from the API: dateTime for timed events, date for all-day ones.
+    """
+    if not value:
+        return None
+    if 'dateTime' in value:
+        return datetime.fromisoformat(value['dateTime'])
+    if 'date' in value:
+        return date.fromisoformat(value['date'])
+    return None
+
+
+class EventRecord:
+    """
+    An event as kept by the store: the fields tools return plus its index timestamps. Attribute
+    names follow gcsa's Event, so the same field getters read either.
+    """
+    __slots__ = (
+        'event_id', 'summary', 'description', 'location', 'start', 'end', 'etag',
+        'start_ts', 'end_ts'
+    )
+
+    def __init__(
+        self,
+        event_id: Optional[str],
+        summary: Optional[str],
+        description: Optional[str],
+        location: Optional[str],
+        start: Union[datetime, date, None],
+        end: Union[datetime, date, None],
+        etag: Optional[str] = None
+    ):
+        self.event_id = event_id
+        self.summary = summary
+        self.description = description
+        self.location = location
+        self.start = start
+        self.end = end
+        self.etag = etag
+        self.start_ts = _timestamp(start) if start is not None else None
+        self.end_ts = _timestamp(end) if end is not None else self.start_ts
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.event_id
+
+    @classmethod
+    def from_json(cls, item: Dict[str, Any]) -> 'EventRecord':
+        """
+        Record for an Events API resource.
+        """
+        return cls(
+            item.get('id'),
+            item.get('summary'),
+            item.get('description'),
+            item.get('location'),
+            _boundary(item.get('start')),
+            _boundary(item.get('end')),
+            item.get('etag')
+        )
+
+
+class CalendarEventStore:
+    """
+    Mirror of one calendar's (single, expanded) events. Holders of the store's lock may sync
+    it; queries and local writes take the same lock. While the calendar is watched (see
+    mcp_tools.google.watch), reads only sync after a notification marks the store changed, or
+    once the last sync is too old.
+    """
+    def __init__(self, calendar_id: str):
+        self.calendar_id = calendar_id
+        self.sync_token: Optional[str] = None
+        self.lock = threading.Lock()
+        self._changed = True
+        self._synced_at = float('-inf')
+        self._events: Dict[str, EventRecord] = {}
+        self._keys: Dict[str, IndexKey] = {}
+        self._index: List[IndexKey] = []
+        # indexed event durations, counted, plus a lazily pruned max-heap of them, so the
+        # longest duration (how far back range scans start) shrinks when long events go
+        self._durations: Counter = Counter()
+        self._duration_heap: List[float] = []
+
+    def _reset(self) -> None:
+        self.sync_token = None
+        self._events.clear()
+        self._keys.clear()
+        self._index.clear()
+        self._durations.clear()
+        self._duration_heap.clear()
+
+    @property
+    def _max_duration(self) -> float:
+        heap = self._duration_heap
+        while heap and -heap[0] not in self._durations:
+            heapq.heappop(heap)
+        return -heap[0] if heap else 0.0
+
+    def _remove(self, event_id: str) -> None:
+        key = self._keys.pop(event_id, None)
+        event = self._events.pop(event_id, None)
+        if key is not None:
+            i = bisect_left(self._index, key)
+            if i < len(self._index) and self._index[i] == key:
+                del self._index[i]
+            duration = event.end_ts - event.start_ts
+            self._durations[duration] -= 1
+            if not self._durations[duration]:
+                del self._durations[duration]
+
+    def upsert(self, event: EventRecord) -> None:
+        if event.event_id is None or event.start_ts is None:
+            return
+
+        self._remove(event.event_id)
+        key = (event.start_ts, event.event_id)
+        self._events[event.event_id] = event
+        self._keys[event.event_id] = key
+        insort(self._index, key)
+        duration = event.end_ts - event.start_ts
+        if not self._durations[duration]:
+            heapq.heappush(self._duration_heap, -duration)
+        self._durations[duration] += 1
+
+    def _apply(self, item: Dict) -> None:
+        if item.get('status') == 'cancelled':
+            self._remove(item['id'])
+        else:
+            self.upsert(EventRecord.from_json(item))
+
+    @property
+    def changed(self) -> bool:
+        """
+        Whether the calendar may have changed since the last sync.
+        """
+        return self._changed
+
+    @property
+    def sync_age(self) -> float:
+        """
+        Seconds since the last successful sync.
+        """
+        return monotonic() - self._synced_at
+
+    def invalidate(self) -> None:
+        """
+        Marks the store changed, so the next read syncs. Doesn't need the lock.
+        """
+        self._changed = True
+
+    def sync(self, service) -> None:
+        """
+        Full sync on first use, then incremental syncs from the stored syncToken. An expired
+        token (410 Gone) drops the store and falls back to a full sync.
+        """
+        # cleared first, so a change notified while the sync runs isn't lost
+        self._changed = False
+        started = monotonic()
+        try:
+            try:
+                self._sync(service)
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                self._reset()
+                self._sync(service)
+        except Exception:
+            self._changed = True
+            raise
+        self._synced_at = started
+
+    def _sync(self, service) -> None:
+        params = {
+            'calendarId': self.calendar_id,
+            'singleEvents': True,
+            'maxResults': SYNC_PAGE_SIZE,
+            'fields': SYNC_FIELDS
+        }
+        if self.sync_token is not None:
+            params['syncToken'] = self.sync_token
+
+        page_token = None
+        while True:
+            response = service.events().list(**params, pageToken=page_token).execute()
+            for item in response.get('items', []):
+                self._apply(item)
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                self.sync_token = response.get('nextSyncToken')
+                break
+
+    def iter_range(
+        self,
+        time_min: datetime,
+        time_max: datetime,
+        after: Optional[IndexKey] = None
+    ) -> Iterator[Tuple[IndexKey, EventRecord]]:
+        """
+        Lazily yields (cursor key, event) for events overlapping [time_min, time_max), ordered by
+        start time, resuming after the given cursor key. Callers must hold the store's lock
+        while iterating.
+        """
+        lo = _timestamp(time_min)
+        hi = _timestamp(time_max)
+        first = bisect_left(self._index, (lo - self._max_duration,))
+        if after is not None:
+            first = max(first, bisect_right(self._index, after))
+
+        for i in range(first, len(self._index)):
+            key = self._index[i]
+            start, event_id = key
+            if start >= hi:
+                return
+
+            event = self._events[event_id]
+            if event.end_ts > lo:
+                yield key, event
+
+    def query(self, time_min: datetime, time_max: datetime) -> List[EventRecord]:
+        """
+        Events overlapping [time_min, time_max), ordered by start time.
+        """
+        return [event for _, event in self.iter_range(time_min, time_max)]
+
+
+class EventStoreRegistry:
+    """
+    Event stores keyed by (principal_id, calendar_id), created under a per-principal shard lock.
+    At most max_stores are kept, least recently read first out, and a store nobody read for
+    idle_seconds is dropped; a dropped calendar is fully synced again on its next read.
+    """
+    def __init__(
+        self,
+        max_stores: int = EVENT_STORE_MAX,
+        idle_seconds: float = EVENT_STORE_IDLE_SECONDS
+    ):
+        self._locks = ShardedMutex()
+        self._stores = TTLCache(ttl=idle_seconds, max_size=max_stores, sliding=True)
+
+    def get(self, principal_id: Optional[str], calendar_id: str) -> CalendarEventStore:
+        key = (principal_id, calendar_id)
+        with self._locks.get(principal_id):
+            store = self._stores.get(key)
+            if store is None:
+                store = CalendarEventStore(calendar_id)
+                self._stores.put(key, store)
+
+        return store
+
+    def peek(self, principal_id: Optional[str], calendar_id: str) -> Optional[CalendarEventStore]:
+        entry = self._stores.get_stale((principal_id, calendar_id))
+        return entry.value if entry is not None else None
+
+    def invalidate(self, principal_id: Optional[str] = None, calendar_id: Optional[str] = None):
+        self._stores.invalidate_where(lambda key: (
+            (principal_id is None or key[0] == principal_id)
+            and (calendar_id is None or key[1] == calendar_id)
+        ))
+
+    def stats(self) -> Dict[str, int]:
+        return self._stores.stats()
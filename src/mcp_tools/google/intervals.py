@@ -0,0 +1,51 @@
+"""
+Provides interval helpers for free/busy queries: merging busy periods from many calendars into
+one sorted, non-overlapping list, and cutting the free windows out of a time range.
+"""
+
+from typing import Iterable, List, Tuple
+
+Interval = Tuple[float, float]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Sorted, non-overlapping union of (start, end) intervals. Touching intervals are joined.
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def free_windows(
+    busy: List[Interval],
+    start: float,
+    end: float,
+    min_length: float = 0.0
+) -> List[Interval]:
+    """
+    Gaps of at least min_length between start and end, given merge_intervals output.
+    """
+    windows: List[Interval] = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_end <= cursor:
+            continue
+        if busy_start >= end:
+            break
+        if busy_start - cursor >= min_length and busy_start > cursor:
+            windows.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+
+    if end - cursor >= min_length and end > cursor:
+        windows.append((cursor, end))
+
+    return windows
@@ -0,0 +1,142 @@
+"""
+Provides the pydantic models used as MCP tool arguments and results for Google Calendar tools.
+Result models describe the tools' structuredContent; lists of records may be sent as a Table
+(the compact format, see mcp_tools.encoding).
+"""
+
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, Field
+from mcp_tools.encoding import Table
+
+
+class EventCreate(BaseModel):
+    """
+    One event to create in batch_create_events.
+    """
+    start: str = Field(description="Start time in ISO format (e.g., '2026-01-06T14:00:00')")
+    name: Optional[str] = Field(default=None, description="Event name/title")
+    calendar_id: str = Field(default='primary', description="The calendar ID from list_calendars")
+    duration_minutes: int = Field(default=30, description="Event duration in minutes")
+    location: Optional[str] = Field(default=None, description="Optional event location")
+    description: Optional[str] = Field(default=None, description="Optional event description")
+
+
+class EventUpdate(BaseModel):
+    """
+    One event change in batch_update_events. Fields left unset keep their current value.
+    """
+    calendar_id: str = Field(description="The calendar ID from list_calendars")
+    event_id: str = Field(description="The event ID from list_events")
+    start: str = Field(description="Updated start time in ISO format (e.g., '2026-01-06T14:00:00')")
+    name: Optional[str] = Field(default=None, description="Updated event name/title")
+    duration_minutes: int = Field(default=30, description="Updated event duration in minutes")
+    location: Optional[str] = Field(default=None, description="Updated event location")
+    description: Optional[str] = Field(default=None, description="Updated event description")
+
+
+class EventRecord(BaseModel):
+    """
+    An event in a tool result. Empty fields, and fields not requested, are left out.
+    """
+    name: Optional[str] = Field(default=None, description="Event name/title")
+    start: Optional[str] = Field(default=None, description="Start time")
+    end: Optional[str] = Field(default=None, description="End time")
+    description: Optional[str] = Field(default=None, description="Event description")
+    event_id: Optional[str] = Field(default=None, description="The event ID for update_event")
+    etag: Optional[str] = Field(default=None, description="The event's etag for update_event")
+
+
+class CalendarEventRecord(EventRecord):
+    """
+    An event in list_events_multi, with the calendar it came from.
+    """
+    calendar_id: Optional[str] = Field(default=None, description="The event's calendar ID")
+
+
+class CalendarRecord(BaseModel):
+    """
+    A calendar in list_calendars.
+    """
+    calendar_id: str = Field(description="The calendar ID for the other calendar tools")
+    name: Optional[str] = Field(default=None, description="Calendar name")
+    description: Optional[str] = Field(default=None, description="Calendar description")
+
+
+class FreeSlot(BaseModel):
+    """
+    A window in find_free_slots when every calendar is free.
+    """
+    start: str = Field(description="Window start in ISO format")
+    end: str = Field(description="Window end in ISO format")
+
+
+class BatchItemResult(BaseModel):
+    """
+    Outcome of one event in batch_create_events and batch_update_events.
+    """
+    index: int = Field(description="Position of the event in the request")
+    status: str = Field(description="'ok' or 'error'")
+    id: Optional[str] = Field(default=None, description="The event ID, when ok")
+    event_details: Optional[EventRecord] = None
+    error: Optional[str] = Field(default=None, description="Why the event failed, when error")
+
+
+class EventResult(BaseModel):
+    """
+    Result of create_event and update_event.
+    """
+    id: str = Field(description="The event ID")
+    event_details: EventRecord
+
+
+class BatchResult(BaseModel):
+    """
+    Result of batch_create_events and batch_update_events.
+    """
+    succeeded: int
+    failed: int
+    results: Union[List[BatchItemResult], Table]
+
+
+class CalendarList(BaseModel):
+    """
+    Result of list_calendars.
+    """
+    calendars: Union[List[CalendarRecord], Table]
+
+
+class EventList(BaseModel):
+    """
+    Result of list_events.
+    """
+    events: Union[List[EventRecord], Table]
+    next_page_token: Optional[str] = Field(
+        default=None,
+        description="Pass as page_token to fetch the next page; absent on the last page"
+    )
+
+
+class MultiEventList(BaseModel):
+    """
+    Result of list_events_multi.
+    """
+    events: Union[List[CalendarEventRecord], Table]
+    next_page_token: Optional[str] = Field(
+        default=None,
+        description="Pass as page_token to fetch the next page; absent on the last page"
+    )
+    errors: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Calendars that could not be read, with the reason"
+    )
+
+
+class FreeSlots(BaseModel):
+    """
+    Result of find_free_slots.
+    """
+    free_slots: Union[List[FreeSlot], Table]
+    errors: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Calendars that could not be read, with the reason; free_slots ignores them"
+    )
@@ -0,0 +1,267 @@
+"""
+Construction of Google Calendar push notification channels (events.watch and
+calendarList.watch). While a channel is open, Google posts to GOOGLE_WEBHOOK_URL whenever the
+watched calendar's events, or the principal's calendar list, change. Cached data can then be
+served without polling until a notification says otherwise.
+
+Channels live in the process that opened them, and a notification that reaches another server
+process (e.g. behind a load balancer) is rejected there. Watched data is therefore still synced
+at least every WATCH_MAX_STALENESS seconds, which bounds how stale the owner's data can get.
+
+Channels are renewed WATCH_RENEW_MARGIN seconds before they expire if their data was read since
+the last renewal. Otherwise they are stopped and left to lapse, and their data goes back to
+being synced on every read.
+"""
+
+import os
+import hmac
+import time
+import uuid
+import secrets
+import logging
+import threading
+from contextlib import AbstractContextManager
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from googleapiclient.errors import HttpError
+from utils.env import load_env
+from utils.metrics import PUSH_NOTIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+load_env()
+# public HTTPS address of the server's /google/notifications route; unset disables push
+GOOGLE_WEBHOOK_URL = os.getenv('GOOGLE_WEBHOOK_URL')
+WATCH_TTL_SECONDS = float(os.getenv('WATCH_TTL_SECONDS', 7 * 24 * 3600))
+WATCH_RENEW_MARGIN = float(os.getenv('WATCH_RENEW_MARGIN', 3600))
+WATCH_RENEW_INTERVAL = float(os.getenv('WATCH_RENEW_INTERVAL', 60))
+# after a failed watch request, reads poll for this long before trying again
+WATCH_RETRY_SECONDS = float(os.getenv('WATCH_RETRY_SECONDS', 600))
+# longest a watched calendar's events go unsynced, should its notifications be missed
+WATCH_MAX_STALENESS = float(os.getenv('WATCH_MAX_STALENESS', 60))
+
+# (principal_id, calendar_id); calendar_id None is the principal's calendar list
+WatchKey = Tuple[Optional[str], Optional[str]]
+
+# open channels of every registry, by channel id, for the webhook
+_channels: Dict[str, 'Channel'] = {}
+
+
+class Channel:
+    """
+    One push notification channel, on a calendar's events or (calendar_id None) on a
+    principal's calendar list. on_change is called for each change notification.
+    """
+    def __init__(
+        self,
+        principal_id: Optional[str],
+        calendar_id: Optional[str],
+        on_change: Callable[[], None]
+    ):
+        self.id = uuid.uuid4().hex
+        self.token = secrets.token_urlsafe(32)
+        self.principal_id = principal_id
+        self.calendar_id = calendar_id
+        self.on_change = on_change
+        self.resource_id: Optional[str] = None
+        self.expiration = 0.0
+        # whether the watched data was read since the channel was opened
+        self.used = False
+
+    @property
+    def key(self) -> WatchKey:
+        return (self.principal_id, self.calendar_id)
+
+    def open(self, service, address: str, ttl: float) -> None:
+        body = {
+            'id': self.id,
+            'type': 'web_hook',
+            'address': address,
+            'token': self.token,
+            'params': {'ttl': str(int(ttl))}
+        }
+        if self.calendar_id is None:
+            request = service.calendarList().watch(body=body)
+        else:
+            request = service.events().watch(calendarId=self.calendar_id, body=body)
+
+        response = request.execute()
+        self.resource_id = response.get('resourceId')
+        expiration = response.get('expiration')
+        self.expiration = int(expiration) / 1000 if expiration else time.time() + ttl
+
+    def stop(self, service) -> None:
+        try:
+            service.channels().stop(body={'id': self.id, 'resourceId': self.resource_id}).execute()
+        except HttpError as e:
+            logger.info("stopping channel %s failed: %s", self.id, e)
+
+
+def handle_notification(headers: Mapping[str, str]) -> int:
+    """
+    Handles one push notification, given its request headers, and returns the HTTP status to
+    answer with. Notifications for unknown channels or with the wrong token are rejected.
+    """
+    state = headers.get('x-goog-resource-state', '')
+    channel = _channels.get(headers.get('x-goog-channel-id', ''))
+    status = 200 if channel is not None and _authentic(channel, headers) else 404
+    if channel is not None and status != 200:
+        logger.warning("rejected notification for channel %s", channel.id)
+        status = 403
+
+    # 'sync' only confirms a new channel; 'exists' and 'not_exists' report changes
+    if status == 200 and state != 'sync':
+        channel.on_change()
+
+    PUSH_NOTIFICATIONS.inc(state, str(status))
+    return status
+
+
+def _authentic(channel: Channel, headers: Mapping[str, str]) -> bool:
+    token = headers.get('x-goog-channel-token', '')
+    if not hmac.compare_digest(token.encode(), channel.token.encode()):
+        return False
+    return channel.resource_id is None or headers.get('x-goog-resource-id') == channel.resource_id
+
+
+class ChannelRegistry:
+    """
+    The open channels of one tool app, at most one per watched resource. service_for(principal)
+    returns a context manager yielding an API service for the principal, for renewals made off
+    the request path.
+    """
+    def __init__(
+        self,
+        service_for: Callable[[Optional[str]], AbstractContextManager],
+        address: Optional[str] = GOOGLE_WEBHOOK_URL,
+        ttl: float = WATCH_TTL_SECONDS
+    ):
+        self.service_for = service_for
+        self.address = address
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._by_key: Dict[WatchKey, Channel] = {}
+        self._opening: Dict[WatchKey, float] = {}
+        self._retry_at: Dict[WatchKey, float] = {}
+        self._renewer: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.address)
+
+    def watching(self, principal_id: Optional[str], calendar_id: Optional[str]) -> bool:
+        """
+        Whether a live channel covers the resource, marking it as read. Channels past their
+        expiration (e.g. a renewal that never ran) are dropped.
+        """
+        channel = self._by_key.get((principal_id, calendar_id))
+        if channel is None:
+            return False
+        if channel.expiration <= time.time():
+            self._drop(channel)
+            return False
+
+        channel.used = True
+        return True
+
+    def watch(
+        self,
+        service,
+        principal_id: Optional[str],
+        calendar_id: Optional[str],
+        on_change: Callable[[], None]
+    ) -> bool:
+        """
+        Opens a channel on the resource unless one is open or being opened. Returns whether the
+        resource is now watched. Call before syncing the data, so no change goes unnotified.
+        """
+        key = (principal_id, calendar_id)
+        if not self.enabled:
+            return False
+        with self._lock:
+            if key in self._by_key:
+                self._by_key[key].used = True
+                return True
+            if key in self._opening or self._retry_at.get(key, 0.0) > time.monotonic():
+                return False
+            self._opening[key] = time.monotonic()
+
+        channel = Channel(principal_id, calendar_id, on_change)
+        try:
+            self._open(service, channel)
+        except HttpError as e:
+            logger.warning("watching %s failed, polling instead: %s", key, e)
+            with self._lock:
+                self._opening.pop(key, None)
+                self._retry_at[key] = time.monotonic() + WATCH_RETRY_SECONDS
+            return False
+
+        channel.used = True
+        self._add(channel)
+        self._ensure_renewer()
+        return True
+
+    def _open(self, service, channel: Channel) -> None:
+        # known to the webhook first, as Google may post the 'sync' message before answering
+        _channels[channel.id] = channel
+        try:
+            channel.open(service, self.address, self.ttl)
+        except Exception:
+            _channels.pop(channel.id, None)
+            raise
+
+    def _add(self, channel: Channel) -> None:
+        with self._lock:
+            self._opening.pop(channel.key, None)
+            self._by_key[channel.key] = channel
+            _channels[channel.id] = channel
+
+    def _drop(self, channel: Channel) -> None:
+        with self._lock:
+            if self._by_key.get(channel.key) is channel:
+                del self._by_key[channel.key]
+            _channels.pop(channel.id, None)
+
+    def _ensure_renewer(self) -> None:
+        if self._renewer is not None:
+            return
+
+        with self._lock:
+            if self._renewer is None:
+                self._renewer = threading.Thread(
+                    target=self._renew_loop,
+                    name='google-channel-renewer',
+                    daemon=True
+                )
+                self._renewer.start()
+
+    def _renew_loop(self) -> None:
+        while True:
+            time.sleep(WATCH_RENEW_INTERVAL)
+            now = time.time()
+            for channel in list(self._by_key.values()):
+                if channel.expiration - now <= WATCH_RENEW_MARGIN:
+                    try:
+                        self._renew(channel)
+                    except Exception:
+                        logger.exception("renewing channel %s failed", channel.id)
+                        self._drop(channel)
+
+    def _renew(self, channel: Channel) -> None:
+        """
+        Replaces a channel about to expire with a new one if its data is still being read, and
+        stops it either way. Stopped channels' data is synced again on its next read.
+        """
+        with self.service_for(channel.principal_id) as service:
+            if channel.used:
+                replacement = Channel(channel.principal_id, channel.calendar_id, channel.on_change)
+                self._open(service, replacement)
+                self._add(replacement)
+            else:
+                self._drop(channel)
+            # anything that changed between the two channels is picked up by one more sync
+            channel.on_change()
+            _channels.pop(channel.id, None)
+            channel.stop(service)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'channels': len(self._by_key), 'opening': len(self._opening)}
@@ -0,0 +1,175 @@
+"""
+Registry and registration engine for tool apps. At startup, register_tools scans each
+registered OAuthToolApp subclass for @tool_scope_factory methods, registers one FastMCP tool per
+method, and precompiles a dispatch entry for it. A tool app is only built (with its provider)
+on the first call to one of its tools.
+
+Tool names, descriptions and argument schemas come from the methods themselves: the method name,
+its docstring, and its keyword arguments other than token and ctx. Methods declared with
+@tool_output_factory also get an output schema and a format argument (see mcp_tools.encoding).
+"""
+
+import inspect
+import threading
+from importlib import import_module
+from typing import Annotated, Any, Dict, List, Optional, Type, Union
+from pydantic import Field
+from mcp.types import CallToolResult
+from mcp.server.fastmcp import FastMCP, Context
+from auth.providers.provider_registry import get_provider
+from mcp_tools.auth_tool_app import OAuthToolApp
+from mcp_tools.encoding import FORMAT_DESCRIPTION, ResultFormat, encode_result
+from utils.concurrency import run_blocking
+from utils.decorators import mcp_oauth_handler
+from utils.metrics import stage
+
+ToolAppClass = Union[str, Type[OAuthToolApp]]
+
+TOOL_APP_REGISTRY: Dict[str, ToolAppClass] = {
+    'google_calendar': 'mcp_tools.google.calendar:GoogleCalendarToolApp'
+}
+
+# filled by the OAuth gate and the MCP server, never part of a tool's arguments
+INJECTED_ARGUMENTS = ('self', 'token', 'ctx')
+# added to tools with an output model; consumed by the dispatch entry, never passed to the method
+FORMAT_PARAMETER = inspect.Parameter(
+    'format',
+    inspect.Parameter.KEYWORD_ONLY,
+    default='json',
+    annotation=Annotated[ResultFormat, Field(description=FORMAT_DESCRIPTION)]
+)
+
+_tool_apps: Dict[str, OAuthToolApp] = {}
+_tool_apps_lock = threading.Lock()
+
+
+def register_tool_app(app_name: str, app_class: ToolAppClass) -> None:
+    TOOL_APP_REGISTRY[app_name] = app_class
+
+
+def _resolve_class(app_name: str) -> Type[OAuthToolApp]:
+    app_class = TOOL_APP_REGISTRY[app_name]
+    if isinstance(app_class, str):
+        module_name, attribute = app_class.split(':')
+        app_class = getattr(import_module(module_name), attribute)
+
+    return app_class
+
+
+def _build_tool_app(app_name: str) -> OAuthToolApp:
+    with _tool_apps_lock:
+        tool_app = _tool_apps.get(app_name)
+        if tool_app is None:
+            app_class = _resolve_class(app_name)
+            tool_app = app_class(provider=get_provider(app_class.provider_name))
+            _tool_apps[app_name] = tool_app
+
+    return tool_app
+
+
+async def get_tool_app(app_name: str) -> OAuthToolApp:
+    """
+    Returns the tool app, building it on the worker pool the first time so provider setup and
+    client imports don't block the event loop.
+    """
+    tool_app = _tool_apps.get(app_name)
+    if tool_app is not None:
+        return tool_app
+
+    if TOOL_APP_REGISTRY.get(app_name) is None:
+        raise RuntimeError("tool app not found")
+
+    return await run_blocking(_build_tool_app, app_name)
+
+
+class ToolEntry:
+    """
+    One row of the dispatch table: everything a call of the tool needs, resolved once at
+    registration. The bound method is filled in when the tool app is first built.
+    """
+    __slots__ = (
+        'name', 'app_name', 'function', 'scopes', 'output', 'parameters', 'app', 'method'
+    )
+
+    def __init__(self, name: str, app_name: str, function):
+        self.name = name
+        self.app_name = app_name
+        self.function = function
+        self.scopes = function.__scopes__
+        self.output = getattr(function, '__output__', None)
+        self.parameters: List[inspect.Parameter] = [
+            parameter.replace(kind=inspect.Parameter.KEYWORD_ONLY)
+            for parameter in inspect.signature(function).parameters.values()
+            if parameter.name not in INJECTED_ARGUMENTS
+        ]
+        if self.output is not None:
+            if any(parameter.name == FORMAT_PARAMETER.name for parameter in self.parameters):
+                raise RuntimeError(f"{name}: 'format' is reserved for the result format")
+            self.parameters.append(FORMAT_PARAMETER)
+        self.app: Optional[OAuthToolApp] = None
+        self.method = None
+
+    async def call(self, ctx: Context, arguments: Dict[str, Any]):
+        method = self.method
+        if method is None:
+            self.app = await get_tool_app(self.app_name)
+            method = self.method = self.function.__get__(self.app)
+
+        if self.output is None:
+            return await self.app.call_tool(self.name, method, self.scopes, ctx, arguments)
+
+        result_format = arguments.pop(FORMAT_PARAMETER.name, FORMAT_PARAMETER.default)
+        result = await self.app.call_tool(self.name, method, self.scopes, ctx, arguments)
+        with stage('serialization'):
+            return encode_result(result, result_format)
+
+
+DISPATCH_TABLE: Dict[str, ToolEntry] = {}
+
+
+def _tool_function(entry: ToolEntry):
+    """
+    The function FastMCP registers for a tool: a ctx parameter plus the method's own
+    arguments, forwarding straight to the dispatch entry. An output model is declared as the
+    return annotation, which FastMCP turns into the output schema.
+    """
+    async def tool(ctx: Context, **arguments):
+        return await entry.call(ctx, arguments)
+
+    context = inspect.Parameter('ctx', inspect.Parameter.KEYWORD_ONLY, annotation=Context)
+    tool.__name__ = tool.__qualname__ = entry.name
+    tool.__doc__ = inspect.getdoc(entry.function)
+    return_annotation = inspect.Signature.empty
+    if entry.output is not None:
+        return_annotation = Annotated[CallToolResult, entry.output]
+    tool.__signature__ = inspect.Signature(
+        [context, *entry.parameters],
+        return_annotation=return_annotation
+    )
+    tool.__annotations__ = {
+        'ctx': Context,
+        **{
+            parameter.name: parameter.annotation
+            for parameter in entry.parameters
+            if parameter.annotation is not inspect.Parameter.empty
+        }
+    }
+    if entry.output is not None:
+        tool.__annotations__['return'] = return_annotation
+    return tool
+
+
+def register_tools(mcp: FastMCP) -> None:
+    """
+    Registers every tool of every registered tool app with the server. Tool app modules are
+    imported here, but no app or provider is built until its first call.
+    """
+    for app_name in TOOL_APP_REGISTRY:
+        app_class = _resolve_class(app_name)
+        for name, function in app_class.tool_methods().items():
+            if name in DISPATCH_TABLE:
+                raise RuntimeError(f"duplicate tool name: {name}")
+
+            entry = DISPATCH_TABLE[name] = ToolEntry(name, app_name, function)
+            handler = mcp_oauth_handler(app_class.auth_message)(_tool_function(entry))
+            mcp.add_tool(handler, name=name)
@@ -0,0 +1,106 @@
+"""
+Construction of a bounded, thread-safe TTL + LRU cache with hit/miss counters. Expired entries
+are kept until evicted so callers can revalidate them (e.g. with an ETag) instead of refetching.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CacheEntry:
+    __slots__ = ('value', 'expires_at', 'etag')
+
+    def __init__(self, value: Any, expires_at: float, etag: Optional[str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.etag = etag
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) < self.expires_at
+
+
+class TTLCache:
+    """
+    Entries expire ttl seconds after they were stored or last revalidated, or with sliding,
+    after they were last read. Once max_size is reached the least recently used entry is evicted.
+    """
+    def __init__(self, ttl: float, max_size: int, sliding: bool = False):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sliding = sliding
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the cached value if it is still fresh, otherwise None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.is_fresh():
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if self.sliding:
+                entry.expires_at = time.monotonic() + self.ttl
+            self.hits += 1
+            return entry.value
+
+    def get_stale(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Returns the entry regardless of freshness, for conditional revalidation.
+        """
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Hashable, value: Any, etag: Optional[str] = None) -> None:
+        with self._lock:
+            self._entries[key] = CacheEntry(value, time.monotonic() + self.ttl, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            # sliding entries are in expiry order, so idle ones are dropped from the front
+            while self.sliding and not next(iter(self._entries.values())).is_fresh():
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key: Hashable) -> None:
+        """
+        Marks an entry as revalidated, restarting its TTL.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + self.ttl
+                self._entries.move_to_end(key)
+                self.revalidations += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions
+        }
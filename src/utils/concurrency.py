@@ -0,0 +1,52 @@
+"""
+Construction of the bounded worker pool used to keep blocking client libraries (gcsa,
+googleapiclient, google-auth) off the FastMCP event loop.
+"""
+
+import os
+import asyncio
+import contextvars
+from functools import partial
+from typing import Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from utils.env import load_env
+
+load_env()
+TOOL_WORKER_THREADS = int(os.getenv('TOOL_WORKER_THREADS', 32))
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv('DEFAULT_TOOL_CONCURRENCY', 16))
+AUTH_WORKER_THREADS = int(os.getenv('AUTH_WORKER_THREADS', 4))
+
+T = TypeVar('T')
+
+_executor = ThreadPoolExecutor(
+    max_workers=TOOL_WORKER_THREADS,
+    thread_name_prefix='tool-worker'
+)
+
+# OAuth code exchanges get their own pool, so a burst of sign-ins can't take worker threads
+# from tool calls of users who are already authorized
+_auth_executor = ThreadPoolExecutor(
+    max_workers=AUTH_WORKER_THREADS,
+    thread_name_prefix='auth-worker'
+)
+
+
+async def _run_in(executor: ThreadPoolExecutor, fn: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    call = partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs a blocking callable on the shared worker pool and awaits its result. Context variables
+    are copied over so request-scoped state is still visible inside the worker thread.
+    """
+    return await _run_in(_executor, fn, *args, **kwargs)
+
+
+async def run_auth_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    run_blocking for OAuth flow work (code exchange, token writes), on the separate auth pool.
+    """
+    return await _run_in(_auth_executor, fn, *args, **kwargs)
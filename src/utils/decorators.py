@@ -3,44 +3,88 @@ Construction of useful decorators and closures.
 """
 
 import os
-import time
-from typing import Tuple, Type, Sequence
-from random import randint
+from typing import Tuple, Type, Sequence, Optional
 from functools import wraps
-from dotenv import load_dotenv
+from pydantic import BaseModel
+from utils.env import load_env
 from mcp.types import ElicitRequestURLParams
 from mcp.shared.exceptions import UrlElicitationRequiredError
 from utils.errors import OAuthRequiredError
+from utils.retry import retry_async
+from utils.resilience import get_api_guard
+from utils.metrics import tool_call
 
-load_dotenv()
+load_env()
 SERVER_HOST = os.getenv('SERVER_HOST')
 SERVER_PORT = os.getenv('SERVER_PORT')
 SERVER_ORIGIN_PROXY = os.getenv('SERVER_ORIGIN_PROXY')
+TOOL_RETRY_DEADLINE = float(os.getenv('TOOL_RETRY_DEADLINE', 20))
 
 
 def tool_retry_factory(
     error_message: str, 
     retry_on: Tuple[Type[Exception]] = (Exception,), 
     retries=3,
+    deadline: Optional[float] = TOOL_RETRY_DEADLINE,
 ):
+    """
+    Retries a tool coroutine through utils.retry. Non-retryable errors (e.g. 404) fail on the
+    first attempt, and the whole call, backoff included, is bounded by deadline seconds.
+    """
     def decorator(fn):
         @wraps(fn)
-        def wrapper(*args, **kwargs):
-            for cnt in range(retries + 1):
-                try:
-                    return fn(*args, **kwargs)
-                except retry_on as e:
-                    if cnt == retries:
-                        raise RuntimeError(f"{error_message}") from e
-
-                    print(f"retrying, ran into error: {e}")
-                    duration = 2**cnt + randint(0, 100) / 100
-                    time.sleep(duration)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await retry_async(
+                    lambda: fn(*args, **kwargs),
+                    name=fn.__name__,
+                    retry_on=retry_on,
+                    retries=retries,
+                    deadline=deadline
+                )
+            except TimeoutError as e:
+                raise RuntimeError(f"{error_message}: deadline exceeded") from e
+            except retry_on as e:
+                raise RuntimeError(f"{error_message}") from e
         
         return wrapper
     return decorator
 
 
+def tool_circuit_factory(
+    provider: str,
+    endpoint: str,
+    failure_on: Tuple[Type[Exception]] = (Exception,)
+):
+    """
+    Runs each attempt of a tool coroutine through the shared circuit breaker and rate limiter of
+    provider's endpoint (utils.resilience). Goes beneath tool_retry_factory, so retries are
+    paced too, and an open circuit raises CircuitOpenError without retrying.
+    """
+    guard = get_api_guard(provider, endpoint, failure_on)
+
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await guard.call(lambda: fn(*args, **kwargs))
+
+        wrapper.__guard__ = guard
+        return wrapper
+    return decorator
+
+
+def tool_coalesce_factory():
+    """
+    Marks a read-only tool method as safe to share: concurrent calls by the same principal with
+    the same arguments wait on one in-flight call and get its result (see
+    OAuthToolApp.call_tool). Only for methods without side effects.
+    """
+    def decorator(fn):
+        fn.__coalesce__ = True
+        return fn
+    return decorator
+
+
 def tool_scope_factory(
     scopes: Sequence[str]
 ):
@@ -50,19 +94,48 @@ def tool_scope_factory(
     return decorator
 
 
+def tool_concurrency_factory(
+    limit: int
+):
+    """
+    Caps the number of in-flight calls of a tool method. Read by OAuthToolApp.call_tool, which
+    falls back to DEFAULT_TOOL_CONCURRENCY for methods without a limit.
+    """
+    def decorator(fn):
+        fn.__concurrency__ = limit
+        return fn
+    return decorator
+
+
+def tool_output_factory(
+    model: Type[BaseModel]
+):
+    """
+    Declares the pydantic model of a tool method's result. register_tools publishes it as the
+    tool's output schema, adds a format argument, and encodes each result with
+    mcp_tools.encoding. The method itself keeps returning a plain dict.
+    """
+    def decorator(fn):
+        fn.__output__ = model
+        return fn
+    return decorator
+
+
 def mcp_oauth_handler(message: str = "Authorization is required."):
     """
     Decorator that handles OAuthRequiredError and converts it to UrlElicitationRequiredError
     for MCP tool functions. Automatically reads SERVER_HOST and SERVER_PORT from environment.
+    Each call is timed and traced as a whole (utils.metrics.tool_call).
 
     Args:
         message: Custom message to display to the user when OAuth is required
     """
     def decorator(fn):
         @wraps(fn)
-        def wrapper(*args, **kwargs):
+        async def wrapper(*args, **kwargs):
             try:
-                return fn(*args, **kwargs)
+                with tool_call(fn.__name__):
+                    return await fn(*args, **kwargs)
             except OAuthRequiredError as e:
                 origin = SERVER_ORIGIN_PROXY if SERVER_ORIGIN_PROXY else f"http://{SERVER_HOST}:{SERVER_PORT}"
                 raise UrlElicitationRequiredError(
@@ -0,0 +1,12 @@
+"""
+Loads the .env file once per process. Modules that read settings at import time call load_env()
+before their os.getenv lookups; only the first call touches disk.
+"""
+
+from functools import cache
+from dotenv import load_dotenv
+
+
+@cache
+def load_env() -> None:
+    load_dotenv()
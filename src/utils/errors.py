@@ -7,8 +7,18 @@ class OAuthRequiredError(RuntimeError):
         self.message = message
         self.elicitation_id = elicitation_id
 
-class MethodNotFoundError(RuntimeError):
+class PrincipalNotFoundError(RuntimeError):
     pass
 
-class ScopesNotFoundError(RuntimeError):
-    pass
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"{name} is unavailable; retry in {retry_in:.1f}s")
+
+class EventConflictError(RuntimeError):
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+        super().__init__(
+            f"event {event_id} has changed since its etag was read; list it again and retry"
+        )
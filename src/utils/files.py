@@ -0,0 +1,133 @@
+"""
+Construction of small file helpers shared across modules.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def create_text_exclusive(path: str, data: str) -> bool:
+    """
+    Creates path with data unless it already exists, and returns whether it did. The file is
+    written to a temp file and hard-linked into place, so it appears complete or not at all, and
+    of several processes racing to create it exactly one wins.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, 'w') as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.link(tmp_path, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.unlink(tmp_path)
+
+
+def freeze_json(value: Any) -> Any:
+    """
+    Read-only view of parsed JSON: objects become mappingproxies and arrays become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_json(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_json(item) for item in value)
+    return value
+
+
+class WatchedJSONFile:
+    """
+    Parsed, read-only copy of a JSON file, loaded once and then reloaded by a background
+    watcher thread whenever the file's stat changes. A reload that fails to read, parse, or
+    validate keeps the previous contents.
+    """
+    def __init__(
+        self,
+        path: str,
+        poll_seconds: float,
+        validate: Optional[Callable[[Mapping[str, Any]], None]] = None
+    ):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._validate = validate
+        self._lock = threading.Lock()
+        self._data: Optional[Mapping[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._rejected: Optional[Tuple[int, int, int]] = None
+        self._watcher: Optional[threading.Thread] = None
+
+        try:
+            self.reload()
+        except (OSError, ValueError):
+            logger.warning("could not load %s yet; retrying on first use", path, exc_info=True)
+
+    @property
+    def data(self) -> Mapping[str, Any]:
+        data = self._data
+        if data is None:
+            self.reload()
+            data = self._data
+
+        return data
+
+    def _file_stamp(self) -> Tuple[int, int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def reload(self) -> bool:
+        """
+        Re-reads the file if it changed since the last load. Returns whether it was reloaded.
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            if self._data is not None and stamp in (self._stamp, self._rejected):
+                return False
+
+            try:
+                with open(self.path) as json_file:
+                    data = freeze_json(json.load(json_file))
+                if self._validate is not None:
+                    self._validate(data)
+            except Exception:
+                # the same broken file isn't re-read (and re-reported) until it changes again
+                self._rejected = stamp
+                raise
+
+            self._data = data
+            self._stamp = stamp
+            self._ensure_watcher()
+
+        return True
+
+    def _ensure_watcher(self) -> None:
+        if self._watcher is None:
+            self._watcher = threading.Thread(
+                target=self._watch,
+                name=f'watch-{os.path.basename(self.path)}',
+                daemon=True
+            )
+            self._watcher.start()
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                if self.reload():
+                    logger.info("reloaded %s", self.path)
+            except Exception:
+                logger.exception("failed to reload %s; keeping the previous contents", self.path)
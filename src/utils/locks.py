@@ -0,0 +1,55 @@
+"""
+Construction of per-key locks for state shared by many principals. The key -> lock map is split
+into shards with their own mutex, so looking up one principal's lock never waits on another's,
+and a lock is dropped as soon as nothing holds or waits on it.
+"""
+
+import os
+import threading
+import weakref
+from typing import Hashable, List, Tuple
+from utils.env import load_env
+
+load_env()
+LOCK_SHARDS = int(os.getenv('LOCK_SHARDS', 64))
+
+
+class KeyedLocks:
+    """
+    Hands out one threading.Lock per key. Callers must keep the returned lock referenced while
+    using it (e.g. `with locks.get(key):`).
+    """
+    def __init__(self, shards: int = LOCK_SHARDS):
+        self._shards: List[Tuple[threading.Lock, weakref.WeakValueDictionary]] = [
+            (threading.Lock(), weakref.WeakValueDictionary()) for _ in range(shards)
+        ]
+
+    def get(self, key: Hashable) -> threading.Lock:
+        mutex, locks = self._shards[hash(key) % len(self._shards)]
+        with mutex:
+            lock = locks.get(key)
+            if lock is None:
+                lock = locks[key] = threading.Lock()
+
+        return lock
+
+
+class ShardedMutex:
+    """
+    Fixed set of mutexes picked by key hash, for guarding short critical sections of a shared
+    structure without one global lock.
+    """
+    def __init__(self, shards: int = LOCK_SHARDS):
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def index(self, key: Hashable) -> int:
+        return hash(key) % len(self._locks)
+
+    def get(self, key: Hashable) -> threading.Lock:
+        return self._locks[self.index(key)]
+
+    def at(self, index: int) -> threading.Lock:
+        return self._locks[index]
@@ -0,0 +1,234 @@
+"""
+Construction of the instrumentation layer: per-tool and per-stage latency histograms, served in
+the Prometheus text format on /metrics, and OpenTelemetry spans with tool and principal
+attributes. Spans are no-ops unless opentelemetry is installed and an SDK is configured.
+
+The histograms are kept in-process rather than through prometheus_client, and opentelemetry is
+only imported on the first span, so neither adds to cold start.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from functools import cache
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from utils.errors import OAuthRequiredError
+from utils.retry import RetryStats, register_retry_hook
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# stages timed inside a tool call, in the order they usually happen
+STAGES = ('auth_lookup', 'token_refresh', 'client_build', 'api_call', 'serialization')
+
+# tool the current call is for, so stages deep in the stack are labelled with it
+current_tool: ContextVar[Optional[str]] = ContextVar('current_tool', default=None)
+
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return ','.join(pairs)
+
+
+class Histogram:
+    """
+    Thread-safe Prometheus-style histogram with one series per label combination.
+    """
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total) for labels, (counts, total) in self._series.items()
+            )
+
+        bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+        for labels, counts, total in series:
+            label_text = _label_text(self.label_names, labels)
+            prefix = f'{label_text},' if label_text else ''
+            cumulative = 0
+            for le, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+
+        return lines
+
+
+class Counter:
+    """
+    Thread-safe Prometheus-style counter with one series per label combination.
+    """
+    def __init__(self, name: str, description: str, label_names: Sequence[str]):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+
+        for labels, value in series:
+            lines.append(f'{self.name}{{{_label_text(self.label_names, labels)}}} {value}')
+
+        return lines
+
+
+TOOL_LATENCY = Histogram(
+    'mcp_tool_duration_seconds',
+    'End-to-end latency of MCP tool calls.',
+    ('tool', 'status')
+)
+STAGE_LATENCY = Histogram(
+    'mcp_tool_stage_duration_seconds',
+    'Latency of the stages of MCP tool calls.',
+    ('tool', 'stage')
+)
+TOOL_ATTEMPTS = Counter(
+    'mcp_tool_attempts_total',
+    'Attempts made by retried tool calls, first attempts included.',
+    ('tool', 'outcome')
+)
+
+TOOL_COALESCED = Counter(
+    'mcp_tool_coalesced_total',
+    'Tool calls answered by an identical call already in flight.',
+    ('tool',)
+)
+
+PUSH_NOTIFICATIONS = Counter(
+    'mcp_push_notifications_total',
+    'Google push notifications received, by resource state and response status.',
+    ('state', 'status')
+)
+
+METRICS = [TOOL_LATENCY, STAGE_LATENCY, TOOL_ATTEMPTS, TOOL_COALESCED, PUSH_NOTIFICATIONS]
+
+
+@cache
+def _trace():
+    """
+    The opentelemetry.trace module, or None when opentelemetry isn't installed.
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace
+
+
+@contextmanager
+def _span(name: str, attributes: Dict[str, Any]) -> Iterator[Any]:
+    trace = _trace()
+    if trace is None:
+        yield None
+        return
+
+    tracer = trace.get_tracer('assistant-mcp')
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def annotate(**attributes: Any) -> None:
+    """
+    Sets attributes (e.g. principal) on the current span, if one is recording.
+    """
+    trace = _trace()
+    if trace is None:
+        return
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        for key, value in attributes.items():
+            span.set_attribute(f'mcp.{key}', value)
+
+
+@contextmanager
+def tool_call(tool: str) -> Iterator[None]:
+    """
+    Times a whole tool call into TOOL_LATENCY, labelled with how it ended, inside a span.
+    Stages timed further down are attributed to this tool.
+    """
+    token = current_tool.set(tool)
+    status = 'error'
+    started = time.perf_counter()
+    try:
+        with _span(f'tool {tool}', {'mcp.tool': tool}):
+            yield
+        status = 'ok'
+    except OAuthRequiredError:
+        status = 'auth_required'
+        raise
+    finally:
+        TOOL_LATENCY.observe(time.perf_counter() - started, tool, status)
+        current_tool.reset(token)
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Times one stage of the current tool call (see STAGES) into STAGE_LATENCY, inside a span.
+    Works in worker threads, as run_blocking copies the caller's context.
+    """
+    tool = current_tool.get() or 'background'
+    started = time.perf_counter()
+    try:
+        with _span(name, {'mcp.tool': tool, **{f'mcp.{k}': v for k, v in attributes.items()}}):
+            yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, tool, name)
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def _count_attempts(stats: RetryStats) -> None:
+    failed = stats.attempts - int(stats.succeeded)
+    if stats.succeeded:
+        TOOL_ATTEMPTS.inc(stats.name, 'ok')
+    if failed:
+        TOOL_ATTEMPTS.inc(stats.name, 'error', amount=failed)
+
+
+register_retry_hook(_count_attempts)
@@ -0,0 +1,252 @@
+"""
+Construction of the shared health guards for upstream APIs: a circuit breaker per provider
+endpoint, and a token bucket per provider whose rate adapts to rate limit responses. Tools share
+one guard per endpoint, so an outage or exhausted quota fails calls fast instead of letting each
+one run its full retry ladder.
+
+The guards are driven from the event loop only and hold no locks.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Type, Any
+from utils.env import load_env
+from utils.errors import CircuitOpenError
+from utils.retry import (
+    is_rate_limited, is_user_rate_limited, is_quota_exhausted, is_retryable, retry_after_seconds
+)
+
+logger = logging.getLogger(__name__)
+
+load_env()
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', 30))
+# the project's API quota in requests per minute, split between SERVER_PROCESSES processes that
+# each run their own rate limiter; sets the default RATE_LIMIT_PER_SECOND
+API_QUOTA_PER_MINUTE = os.getenv('API_QUOTA_PER_MINUTE')
+SERVER_PROCESSES = int(os.getenv('SERVER_PROCESSES', 1))
+RATE_LIMIT_PER_SECOND = float(os.getenv(
+    'RATE_LIMIT_PER_SECOND',
+    float(API_QUOTA_PER_MINUTE) / 60 / SERVER_PROCESSES if API_QUOTA_PER_MINUTE else 10
+))
+RATE_LIMIT_CONFIGURED = bool(os.getenv('RATE_LIMIT_PER_SECOND') or API_QUOTA_PER_MINUTE)
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', 20))
+RATE_LIMIT_MIN_PER_SECOND = float(os.getenv('RATE_LIMIT_MIN_PER_SECOND', 0.5))
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for reset_timeout
+    seconds. It then lets a single probe call through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_SECONDS
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> None:
+        """
+        Raises CircuitOpenError unless a call may go through now.
+        """
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN:
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = self.HALF_OPEN
+
+        if self._probing:
+            raise CircuitOpenError(self.name, self.reset_timeout)
+        self._probing = True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("circuit %s closed", self.name)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("circuit %s open after %d failures", self.name, self.failures)
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """
+        Gives back a half-open probe whose call ended without an answer (e.g. cancelled).
+        """
+        self._probing = False
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket refilled at rate tokens per second, up to burst. A rate limit response halves
+    the rate (down to min_rate) and empties the bucket, pausing it for Retry-After when given;
+    each success raises the rate additively back towards max_rate.
+    """
+    def __init__(
+        self,
+        name: str,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+        min_rate: float = RATE_LIMIT_MIN_PER_SECOND
+    ):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """
+        Waits until tokens are available and takes them. Requests for more than burst tokens
+        are taken burst at a time, so large batches are charged in full.
+        """
+        tokens = max(tokens, 1)
+        while tokens > self.burst:
+            await self._take(self.burst)
+            tokens -= self.burst
+        await self._take(tokens)
+
+    async def _take(self, tokens: int) -> None:
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+
+            wait = max(self._updated - now, 0.0) + (tokens - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+        if retry_after:
+            # refill resumes once the pause is over
+            self._updated = max(self._updated, now + retry_after)
+        logger.warning("rate limiter %s throttled to %.2f/s", self.name, self.rate)
+
+
+class ApiGuard:
+    """
+    Circuit breaker and rate limiter around calls to one provider endpoint. Only errors in
+    failure_on that are retryable (5xx, 429, transport) or report exhausted quota count against
+    the circuit; a 404 or bad input means the API is healthy. So does a per-user rate limit,
+    which only the calling principal's retries back off from.
+    """
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        limiter: AdaptiveRateLimiter,
+        failure_on: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        self.breaker = breaker
+        self.limiter = limiter
+        self.failure_on = failure_on
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """
+        Fails fast while the circuit is open, then waits for rate limiter tokens.
+        """
+        self.breaker.allow()
+        try:
+            await self.limiter.acquire(tokens)
+        except BaseException:
+            self.breaker.release()
+            raise
+
+    def record(self, error: Optional[BaseException] = None) -> None:
+        """
+        Records the outcome of a call started with acquire (error is None on success).
+        """
+        if error is None:
+            self.breaker.record_success()
+            self.limiter.on_success()
+        elif isinstance(error, asyncio.CancelledError):
+            self.breaker.release()
+        elif is_user_rate_limited(error):
+            self.breaker.record_success()
+        elif isinstance(error, self.failure_on) and (
+            is_retryable(error) or is_quota_exhausted(error)
+        ):
+            if is_rate_limited(error) or is_quota_exhausted(error):
+                self.limiter.on_throttle(retry_after_seconds(error))
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        await self.acquire()
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.record(e)
+            raise
+
+        self.record()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_api_guard(
+    provider: str,
+    endpoint: str,
+    failure_on: Tuple[Type[BaseException], ...] = (Exception,)
+) -> ApiGuard:
+    """
+    Guard for provider's endpoint. Circuits are kept per endpoint; the rate limiter is shared by
+    every endpoint of the provider, since quota is counted per project.
+    """
+    name = f"{provider}:{endpoint}"
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        if not RATE_LIMIT_CONFIGURED:
+            logger.warning(
+                "%s: neither API_QUOTA_PER_MINUTE nor RATE_LIMIT_PER_SECOND is set, limiting to "
+                "%.0f requests/s", provider, RATE_LIMIT_PER_SECOND
+            )
+        limiter = _limiters[provider] = AdaptiveRateLimiter(provider)
+
+    return ApiGuard(breaker, limiter, failure_on)
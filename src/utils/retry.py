@@ -0,0 +1,186 @@
+"""
+Construction of the non-blocking retry engine behind tool_retry_factory. Backs off with
+asyncio.sleep, honours Retry-After and Google rate limit reasons, and keeps every tool call
+inside an overall deadline.
+"""
+
+import time
+import json
+import asyncio
+import logging
+from random import uniform
+from typing import Tuple, Type, Optional, Callable, List, Awaitable, Any
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_REASONS = frozenset({'rateLimitExceeded', 'userRateLimitExceeded'})
+# limits of one user, which say nothing about the project's quota or the API's health
+USER_RATE_LIMIT_REASONS = frozenset({'userRateLimitExceeded'})
+# quota spent for the day or project: not worth retrying, but the API should be left alone
+QUOTA_REASONS = frozenset({'quotaExceeded', 'dailyLimitExceeded'})
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+_retry_hooks: List[Callable[['RetryStats'], None]] = []
+
+
+class RetryStats:
+    """
+    Outcome of one tool call under retry, handed to every registered retry hook.
+    """
+    __slots__ = ('name', 'attempts', 'elapsed', 'slept', 'succeeded', 'last_error')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.slept = 0.0
+        self.succeeded = False
+        self.last_error: Optional[BaseException] = None
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+
+def register_retry_hook(hook: Callable[[RetryStats], None]) -> None:
+    """
+    Registers a metrics hook, called once per tool call with its RetryStats.
+    """
+    _retry_hooks.append(hook)
+
+
+def _report(stats: RetryStats) -> None:
+    for hook in _retry_hooks:
+        try:
+            hook(stats)
+        except Exception:
+            logger.exception("retry hook failed")
+
+
+def _http_status(error: BaseException) -> Optional[int]:
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None) or getattr(error, 'status_code', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_reasons(error: BaseException) -> set:
+    """
+    Collects Google error reasons from an HttpError, e.g. 'rateLimitExceeded'.
+    """
+    reasons = set()
+    details = getattr(error, 'error_details', None)
+    if isinstance(details, list):
+        reasons.update(d.get('reason') for d in details if isinstance(d, dict))
+
+    content = getattr(error, 'content', None)
+    if not reasons and content:
+        try:
+            body = json.loads(content)
+            for item in body.get('error', {}).get('errors', []):
+                reasons.add(item.get('reason'))
+        except (ValueError, AttributeError, TypeError):
+            pass
+
+    reasons.discard(None)
+    return reasons
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    resp = getattr(error, 'resp', None)
+    if resp is None or not hasattr(resp, 'get'):
+        return None
+
+    value = resp.get('retry-after') or resp.get('Retry-After')
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        # HTTP-date form is rare for Google APIs; fall back to exponential backoff
+        return None
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    status = _http_status(error)
+    return status == 429 or (status == 403 and bool(_error_reasons(error) & RATE_LIMIT_REASONS))
+
+
+def is_user_rate_limited(error: BaseException) -> bool:
+    reasons = _error_reasons(error)
+    return _http_status(error) in (403, 429) and bool(reasons & USER_RATE_LIMIT_REASONS)
+
+
+def is_quota_exhausted(error: BaseException) -> bool:
+    return _http_status(error) == 403 and bool(_error_reasons(error) & QUOTA_REASONS)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Errors without an HTTP status (network, transport) are retryable. 4xx codes are not, unless
+    they signal rate limiting.
+    """
+    status = _http_status(error)
+    if status is None:
+        return True
+    if status in RETRYABLE_STATUSES:
+        return True
+    if 500 <= status < 600:
+        return True
+
+    return is_rate_limited(error)
+
+
+def backoff_delay(attempt: int, error: BaseException, base: float, cap: float) -> float:
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return min(retry_after, cap)
+
+    delay = min(base * 2**attempt, cap)
+    if is_rate_limited(error):
+        # quota windows are coarse, so back off harder than for transient 5xx
+        delay = min(delay * 2, cap)
+
+    return delay + uniform(0, delay / 4)
+
+
+async def retry_async(
+    call: Callable[[], Awaitable[Any]],
+    *,
+    name: str,
+    retry_on: Tuple[Type[BaseException], ...],
+    retries: int,
+    deadline: Optional[float],
+    base_delay: float = 1.0,
+    max_delay: float = 32.0
+):
+    """
+    Awaits call(), retrying errors in retry_on that are retryable. Gives up early once the next
+    backoff would overrun the deadline, and raises TimeoutError if an attempt itself does.
+    """
+    stats = RetryStats(name)
+    started = time.monotonic()
+    try:
+        for attempt in range(retries + 1):
+            stats.attempts += 1
+            remaining = None if deadline is None else deadline - (time.monotonic() - started)
+            try:
+                async with asyncio.timeout(remaining):
+                    result = await call()
+                stats.succeeded = True
+                return result
+            except retry_on as e:
+                stats.last_error = e
+                if attempt == retries or not is_retryable(e):
+                    raise
+
+                delay = backoff_delay(attempt, e, base_delay, max_delay)
+                if deadline is not None and time.monotonic() - started + delay > deadline:
+                    raise
+
+                logger.warning("%s: retrying in %.2fs after error: %s", name, delay, e)
+                stats.slept += delay
+                await asyncio.sleep(delay)
+    finally:
+        stats.elapsed = time.monotonic() - started
+        _report(stats)